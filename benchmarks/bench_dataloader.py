@@ -0,0 +1,75 @@
+"""Benchmark by-id reads batched by the DataLoader against one query per id.
+
+Issues concurrent lookups of distinct job ids against the in-memory PostgREST
+stand-in with a fixed round-trip latency, once as individual `eq` queries and
+once through `dataloader.get_loader("jobs").load()`, and reports round-trips and
+elapsed time. The read cache is bypassed.
+
+    python -m benchmarks.bench_dataloader --lookups 100 1000 --db-latency 0.005
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+# The app only reads its settings; the stand-in replaces the client
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "SUPABASE_JWT_SECRET"):
+    os.environ.setdefault(name, "http://localhost" if name == "SUPABASE_URL" else "unused.unused.unused")
+
+import database  # noqa: E402
+from benchmarks.postgrest_stub import PostgrestStub  # noqa: E402
+from dataloader import get_loader  # noqa: E402
+from metrics import db_requests, instrument_http_client  # noqa: E402
+
+
+def round_trips() -> int:
+    return int(sum(db_requests.values.values()))
+
+
+async def per_id(ids):
+    async def fetch(job_id):
+        response = await database.get_supabase().table("jobs").select("*").eq("id", job_id).execute()
+        return response.data[0] if response.data else None
+
+    return await asyncio.gather(*(fetch(job_id) for job_id in ids))
+
+
+async def batched(ids):
+    loader = get_loader("jobs")
+    return await asyncio.gather(*(loader.load(job_id) for job_id in ids))
+
+
+async def measure(function, ids):
+    before, started = round_trips(), time.perf_counter()
+    rows = await function(ids)
+    assert all(row is not None and row["id"] == job_id for row, job_id in zip(rows, ids)), "wrong rows"
+    return time.perf_counter() - started, round_trips() - before
+
+
+async def run(args):
+    stub = PostgrestStub(latency=args.db_latency)
+    ids = [str(uuid.UUID(int=i, version=4)) for i in range(max(args.lookups))]
+    stub.seed("jobs", [{"id": job_id, "title": f"Job {i}", "created_at": "2024-01-01T00:00:00+00:00"}
+                       for i, job_id in enumerate(ids)])
+    client = stub.client()
+    database.set_supabase(client)
+    instrument_http_client(client.postgrest.session)
+
+    print(f"{'lookups':>8} {'per-id ms':>10} {'queries':>8} {'batched ms':>11} {'queries':>8} {'speedup':>8}")
+    for count in args.lookups:
+        slow_time, slow_queries = await measure(per_id, ids[:count])
+        fast_time, fast_queries = await measure(batched, ids[:count])
+        print(f"{count:>8} {slow_time * 1000:>10.1f} {slow_queries:>8} {fast_time * 1000:>11.1f} "
+              f"{fast_queries:>8} {slow_time / fast_time:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--db-latency", type=float, default=0.005, help="seconds added to every database round-trip")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark the saved search matcher against a naive per-search scan.
+
+Matches one batch of synthetic jobs against a growing number of synthetic
+notification-enabled saved searches and reports the time per batch for the
+indexed SavedSearchMatcher and for checking every search against every job.
+
+    python -m benchmarks.bench_matcher --jobs 1000 --searches 100 1000 5000 20000
+"""
+import argparse
+import random
+import time
+
+from job_filters import compile_search_params
+from matcher import SavedSearchMatcher, parse_salary
+
+JOB_TYPES = ["full-time", "part-time", "contract", "internship", "temporary"]
+CITIES = ["Berlin", "London", "New York", "San Francisco", "Dublin", "Madrid", "Toronto", "Austin", "Paris", "Lisbon"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne"]
+
+
+def make_jobs(count: int, rng: random.Random):
+    jobs = []
+    for i in range(count):
+        low = rng.randrange(30, 150) * 1000
+        jobs.append({
+            "id": f"job-{i}",
+            "user_id": f"user-{rng.randrange(500)}",
+            "company": f"{rng.choice(COMPANIES)} {rng.choice(['Labs', 'Inc', 'GmbH', 'Ltd'])}",
+            "location": f"{rng.choice(CITIES)}, {rng.choice(['US', 'UK', 'DE', 'ES'])}",
+            "job_type": rng.choice(JOB_TYPES),
+            "is_remote": rng.random() < 0.3,
+            "status": "open",
+            "salary": f"${low:,} - ${low + rng.randrange(10, 50) * 1000:,}",
+        })
+    return jobs
+
+
+def make_searches(count: int, rng: random.Random):
+    searches, settings = [], {}
+    for i in range(count):
+        params = {}
+        if rng.random() < 0.8:
+            params["job_type"] = rng.choice(JOB_TYPES)
+        if rng.random() < 0.4:
+            params["is_remote"] = rng.random() < 0.5
+        if rng.random() < 0.8:
+            params["location"] = rng.choice(CITIES).lower()[: rng.randrange(3, 8)]
+        if rng.random() < 0.5:
+            params["company"] = rng.choice(COMPANIES)
+        if rng.random() < 0.1:
+            params["user_id"] = f"user-{rng.randrange(500)}"
+        user_id = f"user-{i}"
+        searches.append({"id": f"search-{i}", "user_id": user_id, "search_params": params})
+        if rng.random() < 0.5:
+            settings[user_id] = {"min_salary": rng.randrange(40, 120) * 1000, "max_salary": None}
+    return searches, settings
+
+
+def _contains(value, pattern):
+    return value is not None and pattern.lower() in str(value).lower()
+
+
+def matches(job, filters):
+    """Evaluate job filters against a job row in Python, like apply_job_filters would"""
+    if filters.user_id and job.get("user_id") != filters.user_id:
+        return False
+    if filters.company and not _contains(job.get("company"), filters.company):
+        return False
+    if filters.location and not _contains(job.get("location"), filters.location):
+        return False
+    if filters.job_type and job.get("job_type") != filters.job_type:
+        return False
+    if filters.is_remote is not None and job.get("is_remote") != filters.is_remote:
+        return False
+    if filters.status and job.get("status") != filters.status:
+        return False
+    return True
+
+
+def naive_match(jobs, searches, settings):
+    compiled = [(s["id"], compile_search_params(s["search_params"]), settings.get(s["user_id"]) or {}) for s in searches]
+    results = {}
+    for job in jobs:
+        salary = parse_salary(job.get("salary"))
+        for search_id, filters, bounds in compiled:
+            if not matches(job, filters):
+                continue
+            minimum, maximum = bounds.get("min_salary"), bounds.get("max_salary")
+            if salary and ((minimum and salary[1] < minimum) or (maximum and salary[0] > maximum)):
+                continue
+            results.setdefault(search_id, []).append(job["id"])
+    return results
+
+
+def timed(function, *args, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1000, help="jobs per ingested batch")
+    parser.add_argument("--searches", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jobs = make_jobs(args.jobs, rng)
+    print(f"{'searches':>9} {'build ms':>9} {'indexed ms':>11} {'naive ms':>9} {'speedup':>8} {'matches':>8}")
+    for count in args.searches:
+        searches, settings = make_searches(count, rng)
+        build, matcher = timed(SavedSearchMatcher, searches, settings, repeat=1)
+        indexed, fast = timed(matcher.match, jobs)
+        naive, slow = timed(naive_match, jobs, searches, settings, repeat=1)
+        assert fast == slow, "indexed and naive matching disagree"
+        total = sum(len(job_ids) for job_ids in fast.values())
+        print(f"{count:>9} {build * 1000:>9.1f} {indexed * 1000:>11.1f} {naive * 1000:>9.1f} "
+              f"{naive / indexed:>7.1f}x {total:>8}")
+
+
+if __name__ == "__main__":
+    main()
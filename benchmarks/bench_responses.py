@@ -0,0 +1,110 @@
+"""Benchmark encoding database rows into a JSON response.
+
+Serializes synthetic job rows three ways: FastAPI's default `response_model`
+path (per-field validation, `jsonable_encoder`, then `json.dumps` in
+`JSONResponse`), the batched TypeAdapter pass in responses.py, and the trusted
+path that skips validation. The first two must produce the same document; the
+trusted one has the same rows with timestamps as the database formats them.
+
+    python -m benchmarks.bench_responses --rows 100 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Encoding never touches the database, but it reads the settings
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "SUPABASE_JWT_SECRET"):
+    os.environ.setdefault(name, "http://localhost" if name == "SUPABASE_URL" else "unused.unused.unused")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+import responses  # noqa: E402
+from config import get_settings  # noqa: E402
+from models import Job  # noqa: E402
+
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne"]
+WORDS = ["python", "fastapi", "postgresql", "react", "docker", "team", "build", "services", "remote", "data"]
+
+
+def make_rows(count: int, rng: random.Random):
+    """Job rows shaped like PostgREST returns them, timestamps as ISO strings"""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "user_id": "00000000-0000-4000-8000-000000000000",
+            "title": f"Senior {rng.choice(WORDS)} engineer",
+            "company": rng.choice(COMPANIES),
+            "location": "Berlin",
+            "salary": f"{50 + rng.randrange(50)}k-{100 + rng.randrange(50)}k",
+            "job_type": "full-time",
+            "is_remote": rng.random() < 0.3,
+            "site": "linkedin",
+            "job_url": f"https://jobs.example.com/{i}",
+            "description": " ".join(rng.choices(WORDS, k=60)),
+            "date_posted": (start + timedelta(days=i // 100)).isoformat(),
+            "date_scraped": (start + timedelta(minutes=i)).isoformat(),
+            "status": "open",
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+FIELD = create_response_field(name="response", type_=List[Job])
+LOOP = asyncio.new_event_loop()
+
+
+def fastapi_default(rows) -> bytes:
+    content = LOOP.run_until_complete(serialize_response(field=FIELD, response_content=rows, exclude_unset=True))
+    return JSONResponse(content).body
+
+
+def validated(rows) -> bytes:
+    get_settings().RESPONSE_VALIDATION = True
+    return responses.rows_response(List[Job], rows).body
+
+
+def trusted(rows) -> bytes:
+    get_settings().RESPONSE_VALIDATION = False
+    return responses.rows_response(List[Job], rows).body
+
+
+def timed(function, *args, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'rows':>8} {'fastapi ms':>11} {'validated ms':>13} {'trusted ms':>11} {'speedup':>8} {'trusted':>8}")
+    for count in args.rows:
+        rows = make_rows(count, rng)
+        default_time, expected = timed(fastapi_default, rows)
+        validated_time, body = timed(validated, rows)
+        trusted_time, trusted_body = timed(trusted, rows)
+        assert json.loads(body) == json.loads(expected), "validated body differs"
+        assert len(json.loads(trusted_body)) == count, "trusted body is missing rows"
+        print(f"{count:>8} {default_time * 1000:>11.1f} {validated_time * 1000:>13.1f} "
+              f"{trusted_time * 1000:>11.1f} {default_time / validated_time:>7.1f}x "
+              f"{default_time / trusted_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark CV-to-job scoring against a per-job Python loop.
+
+Builds a JobIndex over synthetic job descriptions and ranks one CV against all
+of them, once as the sparse matrix-vector product in scoring.py and once as a
+dictionary cosine similarity per pre-vectorized job. Index build and matrix
+derivation times are reported separately.
+
+    python -m benchmarks.bench_scoring --jobs 1000 10000 100000
+"""
+import argparse
+import math
+import random
+import time
+
+from scoring import JobIndex, _feature, job_text, tokenize
+
+SKILLS = [
+    "python", "java", "go", "rust", "c++", "c#", "typescript", "react", "node.js", "django", "fastapi", "flask",
+    "postgresql", "mysql", "redis", "kafka", "docker", "kubernetes", "aws", "gcp", "azure", "terraform",
+    "spark", "airflow", "pandas", "numpy", "pytorch", "tensorflow", "graphql", "grpc", "linux", "ci/cd",
+]
+WORDS = [
+    "team", "build", "scalable", "services", "customers", "product", "design", "experience", "years", "remote",
+    "collaborate", "ownership", "platform", "data", "systems", "growth", "mentor", "engineers", "deliver", "quality",
+]
+
+
+def make_jobs(count: int, rng: random.Random):
+    return [
+        {
+            "id": f"job-{i}",
+            "title": f"{rng.choice(['Senior', 'Staff', 'Junior', 'Lead'])} {rng.choice(SKILLS)} engineer",
+            "description": " ".join(rng.choices(SKILLS, k=12) + rng.choices(WORDS, k=60)),
+        }
+        for i in range(count)
+    ]
+
+
+def dict_vector(text: str, idf):
+    """Normalized TF-IDF weights as a {feature: weight} dictionary"""
+    counts = {}
+    for token in tokenize(text):
+        feature = _feature(token)
+        counts[feature] = counts.get(feature, 0) + 1
+    vector = {feature: (1.0 + math.log(count)) * float(idf[feature]) for feature, count in counts.items()}
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {feature: value / norm for feature, value in vector.items()}
+
+
+def naive_scores(query, job_vectors):
+    """Cosine similarity of a CV with every pre-vectorized job, one job at a time"""
+    return [
+        (job_id, sum(value * query.get(feature, 0.0) for feature, value in vector.items()))
+        for job_id, vector in job_vectors
+    ]
+
+
+def timed(function, *args, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cv = " ".join(rng.sample(SKILLS, 8) + rng.choices(WORDS, k=100))
+    print(f"{'jobs':>8} {'index ms':>9} {'matrix ms':>10} {'score ms':>9} {'loop ms':>9} {'speedup':>8}")
+    for count in args.jobs:
+        jobs = make_jobs(count, rng)
+        index = JobIndex()
+        build, _ = timed(index.upsert, jobs, repeat=1)
+        matrix, _ = timed(index.matrix, repeat=1)
+        fast_time, fast = timed(index.score, cv, args.top_k)
+        idf = index.matrix().idf
+        job_vectors = [(job["id"], dict_vector(job_text(job), idf)) for job in jobs]
+        slow_time, slow = timed(naive_scores, dict_vector(cv, idf), job_vectors, repeat=1)
+        best = sorted(slow, key=lambda pair: -pair[1])[:args.top_k]
+        assert all(math.isclose(a, b, rel_tol=1e-4) for (_, a), (_, b) in zip(fast, best)), "scores disagree"
+        print(f"{count:>8} {build * 1000:>9.1f} {matrix * 1000:>10.1f} {fast_time * 1000:>9.2f} "
+              f"{slow_time * 1000:>9.1f} {slow_time / fast_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
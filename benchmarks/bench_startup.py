@@ -0,0 +1,105 @@
+"""Benchmark cold start: time from a fresh interpreter to the first response.
+
+Each run starts a new Python process that imports the app, builds the client
+(the PostgREST stand-in from benchmarks/postgrest_stub.py), runs the lifespan
+startup and serves one request through httpx's ASGI transport. The median of
+each phase is reported; `--importtime` lists the slowest imports of one run.
+
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --importtime 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = ("import_app", "client", "startup", "first_response", "total")
+
+# Runs in the child process; prints the phase timings as JSON
+CHILD = """
+import time
+started = time.perf_counter()
+import asyncio, json
+from main import app
+imported = time.perf_counter()
+
+import database, httpx
+from benchmarks.postgrest_stub import PostgrestStub
+database.set_supabase(PostgrestStub().client())
+client_ready = time.perf_counter()
+
+async def serve():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            response = await client.get("/jobs/?limit=1")
+            assert response.status_code == 200, response.text
+        return ready, time.perf_counter()
+
+ready, responded = asyncio.run(serve())
+print(json.dumps({
+    "import_app": imported - started,
+    "client": client_ready - imported,
+    "startup": ready - client_ready,
+    "first_response": responded - ready,
+    "total": responded - started,
+}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    # The app only reads its settings; the stand-in replaces the client
+    for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "SUPABASE_JWT_SECRET"):
+        env.setdefault(name, "http://localhost" if name == "SUPABASE_URL" else "unused.unused.unused")
+    return env
+
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(count: int):
+    """(cumulative seconds, module) of the slowest top-level imports of `main`"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=child_env(), capture_output=True, text=True, check=True,
+    )
+    imports = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # Two spaces of indentation per nesting level; keep the direct children of `main`
+        if len(module) - len(module.lstrip()) <= 3:
+            imports.append((int(cumulative) / 1e6, module.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=0, help="also list this many of the slowest imports")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"{'phase':<16} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for phase in PHASES:
+        values = [run[phase] * 1000 for run in runs]
+        print(f"{phase:<16} {statistics.median(values):>10.1f} {min(values):>8.1f} {max(values):>8.1f}")
+
+    if args.importtime:
+        print(f"\n{'import':<40} {'ms':>8}")
+        for seconds, module in slowest_imports(args.importtime):
+            print(f"{module:<40} {seconds * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Load benchmark of the API against an in-memory PostgREST stand-in.
+
+Seeds a deterministic dataset, runs the FastAPI app in-process (lifespan
+included) behind httpx's ASGI transport, and drives each endpoint scenario with
+concurrent clients. Reports throughput and p50/p95/p99 latency per endpoint and,
+with --compare, checks them against a baseline recorded earlier, exiting
+non-zero on regressions.
+
+    python -m benchmarks.load                       # report only
+    python -m benchmarks.load --save-baseline       # record benchmarks/baseline.json
+    python -m benchmarks.load --compare             # compare with it
+    python -m benchmarks.load --jobs 20000 --concurrency 64 --db-latency 0.002
+
+Baselines are machine specific and not committed; record one on the machine
+that runs the check, before the change under test.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+# The app reads its settings on first use; the stub replaces the client before use
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "SUPABASE_JWT_SECRET"):
+    os.environ.setdefault(name, "http://localhost" if name == "SUPABASE_URL" else "unused.unused.unused")
+
+import database  # noqa: E402
+from benchmarks.postgrest_stub import PostgrestStub  # noqa: E402
+from tasks import get_task_queue  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+SKILLS = ["python", "fastapi", "postgresql", "react", "typescript", "docker", "kubernetes", "aws", "go", "rust"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne"]
+CITIES = ["Berlin", "London", "New York", "Dublin", "Madrid", "Toronto", "Austin", "Paris", "Lisbon", "Remote"]
+STATUSES = ["saved", "applied", "interviewing", "offer", "rejected"]
+
+# (name, build request) where build returns (method, url, json body)
+Request = Tuple[str, str, Optional[Dict[str, Any]]]
+Scenario = Tuple[str, Callable[[random.Random, Dict[str, List[str]]], Request]]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def seed_dataset(stub: PostgrestStub, users: int, jobs: int, rng: random.Random) -> Dict[str, List[str]]:
+    """Fill the stub with a reproducible dataset and return the ids by table"""
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def stamp(i: int) -> str:
+        return (start + timedelta(minutes=i)).isoformat()
+
+    ids: Dict[str, List[str]] = {"users": [], "jobs": [], "cvs": [], "job_applications": []}
+    for u in range(users):
+        user_id = _uuid(rng)
+        ids["users"].append(user_id)
+        stub.seed("profiles", [{"id": user_id, "email": f"user{u}@example.com", "full_name": f"User {u}",
+                                "created_at": stamp(u)}])
+        stub.seed("user_settings", [{"user_id": user_id, "min_salary": 50000, "created_at": stamp(u)}])
+        cv_id = _uuid(rng)
+        ids["cvs"].append(cv_id)
+        stub.seed("cvs", [{"id": cv_id, "user_id": user_id, "name": f"CV {u}", "skills": rng.sample(SKILLS, 4),
+                           "content": " ".join(rng.choices(SKILLS, k=30)), "is_primary": True,
+                           "created_at": stamp(u)}])
+
+    job_rows = []
+    for j in range(jobs):
+        job_id = _uuid(rng)
+        ids["jobs"].append(job_id)
+        job_rows.append({
+            "id": job_id,
+            "user_id": rng.choice(ids["users"]),
+            "title": f"{rng.choice(['Senior', 'Junior', 'Staff'])} {rng.choice(SKILLS)} engineer",
+            "company": rng.choice(COMPANIES),
+            "location": rng.choice(CITIES),
+            "job_type": rng.choice(["full-time", "contract"]),
+            "is_remote": rng.random() < 0.3,
+            "job_url": f"https://jobs.example.com/{j}",
+            "description": " ".join(rng.choices(SKILLS, k=40)),
+            "date_scraped": stamp(j),
+            "status": "open",
+            "created_at": stamp(j),
+        })
+    stub.seed("jobs", job_rows)
+
+    application_rows, timeline_rows = [], []
+    for a in range(jobs // 2):
+        application_id = _uuid(rng)
+        ids["job_applications"].append(application_id)
+        user = rng.randrange(users)
+        application_rows.append({
+            "id": application_id,
+            "user_id": ids["users"][user],
+            "job_id": rng.choice(ids["jobs"]),
+            "cv_id": ids["cvs"][user],
+            "status": rng.choice(STATUSES),
+            "created_at": stamp(a),
+        })
+        timeline_rows.append({"id": _uuid(rng), "application_id": application_id, "event_type": "created",
+                              "created_at": stamp(a)})
+    stub.seed("job_applications", application_rows)
+    stub.seed("application_timeline", timeline_rows)
+    return ids
+
+
+SCENARIOS: List[Scenario] = [
+    ("GET /jobs/", lambda rng, ids: ("GET", "/jobs/?limit=50", None)),
+    ("GET /jobs/?company", lambda rng, ids: ("GET", f"/jobs/?company={rng.choice(COMPANIES)[:4]}&limit=50", None)),
+    ("GET /jobs/{id}", lambda rng, ids: ("GET", f"/jobs/{rng.choice(ids['jobs'])}", None)),
+    ("GET /jobs/search", lambda rng, ids: ("GET", f"/jobs/search?q={rng.choice(SKILLS)}", None)),
+    ("GET /job-applications/", lambda rng, ids: (
+        "GET", f"/job-applications/?user_id={rng.choice(ids['users'])}", None)),
+    ("GET /users/{id}/dashboard", lambda rng, ids: ("GET", f"/users/{rng.choice(ids['users'])}/dashboard", None)),
+    ("GET /users/{id}/stats", lambda rng, ids: ("GET", f"/users/{rng.choice(ids['users'])}/stats", None)),
+    ("POST /cvs/{id}/match-scores", lambda rng, ids: (
+        "POST", f"/cvs/{rng.choice(ids['cvs'])}/match-scores?write_back=false", None)),
+    ("POST /jobs/", lambda rng, ids: ("POST", "/jobs/", {
+        "title": f"{rng.choice(SKILLS)} developer", "company": rng.choice(COMPANIES),
+        "description": " ".join(rng.choices(SKILLS, k=40)), "user_id": rng.choice(ids["users"]),
+    })),
+    ("PUT /job-applications/{id}", lambda rng, ids: (
+        "PUT", f"/job-applications/{rng.choice(ids['job_applications'])}", {"status": rng.choice(STATUSES)})),
+]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_scenario(client: httpx.AsyncClient, build, ids, requests: int, concurrency: int, rng: random.Random):
+    """Send `requests` requests from `concurrency` workers; return latencies, errors and elapsed seconds.
+
+    Elapsed time includes draining the background tasks the requests queued, so
+    deferred side effects count against throughput.
+    """
+    planned = [build(rng, ids) for _ in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+    position = 0
+
+    async def worker():
+        nonlocal errors, position
+        while position < len(planned):
+            method, url, body = planned[position]
+            position += 1
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await get_task_queue().drain()
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run(args) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(args.seed)
+    stub = PostgrestStub(latency=args.db_latency)
+    ids = seed_dataset(stub, args.users, args.jobs, rng)
+    database.set_supabase(stub.client())
+
+    from main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, build in SCENARIOS:
+                if args.only and not any(part in name for part in args.only):
+                    continue
+                await run_scenario(client, build, ids, args.warmup, args.concurrency, rng)
+                runs = []
+                for _ in range(args.repeat):
+                    latencies, errors, elapsed = await run_scenario(
+                        client, build, ids, args.requests, args.concurrency, rng
+                    )
+                    runs.append({
+                        "rps": len(latencies) / elapsed,
+                        "p50_ms": percentile(latencies, 0.50) * 1000,
+                        "p95_ms": percentile(latencies, 0.95) * 1000,
+                        "p99_ms": percentile(latencies, 0.99) * 1000,
+                        "errors": errors,
+                    })
+                # The fastest run is the least disturbed by noise from the rest of the machine
+                results[name] = max(runs, key=lambda run: run["rps"])
+                results[name]["errors"] = sum(run["errors"] for run in runs)
+    return results
+
+
+def compare(results, baseline, tolerance: float, slack_ms: float) -> List[str]:
+    """Endpoints whose p50/p95 latency or throughput is worse than the baseline by more than `tolerance`.
+
+    Latency must also grow by more than `slack_ms`, so sub-millisecond jitter on
+    fast endpoints is not reported.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            limit = max(previous[metric] * (1 + tolerance), previous[metric] + slack_ms)
+            if current[metric] > limit:
+                regressions.append(f"{name}: {metric} {previous[metric]:.2f} -> {current[metric]:.2f}")
+        if current["rps"] < previous["rps"] / (1 + tolerance):
+            regressions.append(f"{name}: rps {previous['rps']:.0f} -> {current['rps']:.0f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="measured runs per endpoint; the fastest is kept")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="seconds added to every database round-trip")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="*", help="run only endpoints whose name contains one of these")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="fail on regressions against --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing, e.g. 0.25")
+    parser.add_argument("--slack-ms", type=float, default=2.0, help="latency growth always tolerated")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"{'endpoint':<30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, row in results.items():
+        print(f"{name:<30} {row['rps']:>8.0f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+              f"{row['p99_ms']:>8.2f} {row['errors']:>7}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if any(row["errors"] for row in results.values()):
+        sys.exit("Requests failed during the benchmark")
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"No baseline at {args.baseline}; record one with --save-baseline first")
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance, args.slack_ms)
+        if regressions:
+            print("Regressions against baseline:", *regressions, sep="\n  ")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""In-memory PostgREST stand-in for benchmarks.
+
+Implements the subset of the PostgREST HTTP protocol that the routers use
+(filters, ``or=`` logic trees, ordering, limits, inserts, upserts, updates,
+deletes and a couple of RPC functions) on top of plain Python lists, and plugs
+into the real ``postgrest``/``supabase`` client through an ``httpx.MockTransport``.
+"""
+import asyncio
+import json
+import re
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+# Primary key per table; everything else uses ``id``
+PRIMARY_KEYS = {"user_settings": "user_id"}
+
+# Tables whose rows get an ``updated_at`` timestamp maintained on writes
+UPDATED_AT_TABLES = {
+    "profiles", "cvs", "jobs", "job_applications", "application_timeline", "user_settings", "saved_searches",
+}
+
+# Tables whose writes bump a per-parent counter in ``collection_versions``, with the parent column
+VERSIONED_TABLES = {"job_applications": "user_id", "application_timeline": "application_id"}
+
+
+class UniqueViolation(ValueError):
+    """A duplicate key, reported with PostgreSQL's SQLSTATE 23505"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses or double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+@lru_cache(maxsize=1 << 16)
+def _coerce_text(value: str) -> Any:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+
+
+def _coerce(value: Any) -> Any:
+    """Normalize values so that timestamps compare chronologically"""
+    return _coerce_text(value) if isinstance(value, str) else value
+
+
+def _compare(left: Any, right: Any) -> Tuple[Any, Any]:
+    left, right = _coerce(left), _coerce(right)
+    if isinstance(left, bool) or isinstance(right, bool):
+        return str(left).lower(), str(right).lower()
+    if isinstance(left, (int, float)) and isinstance(right, str):
+        try:
+            return left, float(right)
+        except ValueError:
+            return str(left), right
+    if type(left) is not type(right):
+        return str(left), str(right)
+    return left, right
+
+
+def _like(value: Any, pattern: str, insensitive: bool) -> bool:
+    if value is None:
+        return False
+    regex = "^" + ".*".join(re.escape(part) for part in pattern.replace("*", "%").split("%")) + "$"
+    return re.match(regex, str(value), re.IGNORECASE if insensitive else 0) is not None
+
+
+def _predicate(column: str, expression: str) -> Callable[[Dict[str, Any]], bool]:
+    """Build a row predicate from a PostgREST ``operator.value`` expression"""
+    negate = False
+    if expression.startswith("not."):
+        negate, expression = True, expression[4:]
+    operator, _, raw = expression.partition(".")
+    value = _unquote(raw)
+    options: set = set()
+    if operator == "in":
+        listed = [_unquote(v) for v in _split_top_level(value.strip("()"))]
+        options = set(listed) | {option.lower() for option in listed}
+
+    def check(row: Dict[str, Any]) -> bool:
+        current = row.get(column)
+        if operator == "is":
+            expected = {"null": None, "true": True, "false": False}.get(value.lower(), value)
+            return current is expected
+        if operator == "in":
+            return current is not None and str(current).lower() in options
+        if operator in ("like", "ilike"):
+            return _like(current, value, operator == "ilike")
+        if operator in ("cs", "ov"):
+            if value.startswith("["):
+                wanted = json.loads(value)
+            else:
+                wanted = [_unquote(v) for v in _split_top_level(value.strip("{}"))]
+            have = current or []
+            return all(w in have for w in wanted) if operator == "cs" else any(w in have for w in wanted)
+        if current is None:
+            return False
+        left, right = _compare(current, value)
+        if operator == "eq":
+            return left == right
+        if operator == "neq":
+            return left != right
+        if operator == "gt":
+            return left > right
+        if operator == "gte":
+            return left >= right
+        if operator == "lt":
+            return left < right
+        if operator == "lte":
+            return left <= right
+        raise ValueError(f"unsupported operator {operator}")
+
+    return (lambda row: not check(row)) if negate else check
+
+
+def _logic_tree(kind: str, body: str) -> Callable[[Dict[str, Any]], bool]:
+    """Parse the body of an ``or=(...)`` / ``and=(...)`` parameter"""
+    children = []
+    for part in _split_top_level(body):
+        match = re.match(r"^(not\.)?(and|or)\((.*)\)$", part)
+        if match:
+            child = _logic_tree(match.group(2), match.group(3))
+            children.append((lambda c: lambda row: not c(row))(child) if match.group(1) else child)
+        else:
+            column, _, expression = part.partition(".")
+            children.append(_predicate(column, expression))
+    if kind == "or":
+        return lambda row: any(child(row) for child in children)
+    return lambda row: all(child(row) for child in children)
+
+
+def _sort_key(value: Any) -> Tuple[bool, Any]:
+    return value is None, _coerce(value) if value is not None else 0
+
+
+def _project(row: Dict[str, Any], select: str) -> Dict[str, Any]:
+    if not select or select == "*":
+        return dict(row)
+    columns = [c.strip() for c in _split_top_level(select) if "(" not in c]
+    if "*" in columns:
+        return dict(row)
+    return {column: row.get(column) for column in columns}
+
+
+def _search_jobs(stub: "PostgrestStub", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Crude stand-in for the search_jobs function: rank by term occurrences"""
+    terms = [term.strip('"') for term in params["search_query"].lower().split() if term not in ("or",)]
+    results = []
+    for job in stub.rows("jobs"):
+        if params.get("filter_user_id") and job.get("user_id") != params["filter_user_id"]:
+            continue
+        text = " ".join(str(job.get(k) or "") for k in ("title", "company", "description")).lower()
+        rank = sum(text.count(term) for term in terms if not term.startswith("-"))
+        if rank:
+            results.append({"job": job, "rank": float(rank)})
+    results.sort(key=lambda result: -result["rank"])
+    offset = params.get("result_offset", 0)
+    return results[offset:offset + params.get("result_limit", 20)]
+
+
+class PostgrestStub:
+    """In-memory tables served over a fake PostgREST HTTP interface.
+
+    ``latency`` adds a fixed delay to every round-trip to stand in for the
+    network hop to a real database. Selects return at most ``max_rows`` rows,
+    like PostgREST's db-max-rows (1000 on Supabase).
+    """
+
+    def __init__(self, latency: float = 0.0, max_rows: Optional[int] = 1000) -> None:
+        self.latency = latency
+        self.max_rows = max_rows
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.rpc: Dict[str, Callable[["PostgrestStub", Dict[str, Any]], Any]] = {"search_jobs": _search_jobs}
+        self.request_count = 0
+        # Primary key -> row per table, built on first use and dropped on delete
+        self._indexes: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        self.tables.setdefault(table, []).extend(rows)
+        self._indexes.pop(table, None)
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(table, [])
+
+    # HTTP layer -----------------------------------------------------------
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.request_count += 1
+        path = request.url.path
+        name = path.rsplit("/", 1)[-1]
+        params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        body = json.loads(request.content) if request.content else None
+        prefer = request.headers.get("prefer", "")
+        try:
+            if "/rpc/" in path:
+                return self._json(self.rpc[name](self, body or {}))
+            if request.method == "GET":
+                rows, total = self._select(name, params)
+                span = f"0-{len(rows) - 1}" if rows else "*"
+                count = total if "count=exact" in prefer else "*"
+                return self._json(rows, headers={"content-range": f"{span}/{count}"})
+            if request.method == "POST":
+                return self._json(self._insert(name, params, body, prefer), status=201)
+            if request.method == "PATCH":
+                return self._json(self._update(name, params, body))
+            if request.method == "DELETE":
+                return self._json(self._delete(name, params))
+        except UniqueViolation as exc:
+            return self._json({"message": str(exc), "code": "23505", "hint": None, "details": None}, status=409)
+        except Exception as exc:  # surface as a PostgREST-style error
+            return self._json({"message": str(exc), "code": "stub", "hint": None, "details": None}, status=400)
+        return self._json({"message": "unsupported"}, status=405)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.handle(request)
+
+    @staticmethod
+    def _json(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        return httpx.Response(
+            status,
+            content=json.dumps(payload, default=str).encode(),
+            headers={"content-type": "application/json", **(headers or {})},
+        )
+
+    # Query evaluation -----------------------------------------------------
+
+    def _filters(self, params: List[Tuple[str, str]]) -> Callable[[Dict[str, Any]], bool]:
+        predicates = []
+        for key, value in params:
+            if key in ("select", "order", "limit", "offset", "columns", "on_conflict"):
+                continue
+            if key in ("or", "and"):
+                predicates.append(_logic_tree(key, value.strip()[1:-1]))
+            elif key in ("not.or", "not.and"):
+                tree = _logic_tree(key[4:], value.strip()[1:-1])
+                predicates.append(lambda row, tree=tree: not tree(row))
+            else:
+                predicates.append(_predicate(key, value))
+        return lambda row: all(p(row) for p in predicates)
+
+    def _candidates(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Rows that can match; a primary key equality filter is answered from the index"""
+        key = PRIMARY_KEYS.get(table, "id")
+        value = next((v[3:] for k, v in params if k == key and v.startswith("eq.")), None)
+        if value is None:
+            return self.rows(table)
+        index = self._indexes.get(table)
+        if index is None:
+            index = self._indexes[table] = {str(row.get(key)): row for row in self.rows(table)}
+        row = index.get(_unquote(value))
+        return [row] if row is not None else []
+
+    def _select(self, table: str, params: List[Tuple[str, str]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Rows of one page and the number of rows matching the filters"""
+        query = dict(params)
+        check = self._filters(params)
+        matches = [row for row in self._candidates(table, params) if check(row)]
+        for clause in reversed(query.get("order", "").split(",") if query.get("order") else []):
+            column, *modifiers = clause.split(".")
+            desc = "desc" in modifiers
+            matches.sort(key=lambda r: _sort_key(r.get(column)), reverse=desc)
+        total = len(matches)
+        offset = int(query.get("offset", 0))
+        limits = [int(query["limit"])] if "limit" in query else []
+        if self.max_rows is not None:
+            limits.append(self.max_rows)
+        matches = matches[offset:offset + min(limits)] if limits else matches[offset:]
+        return [_project(row, query.get("select", "*")) for row in matches], total
+
+    def _insert(self, table: str, params: List[Tuple[str, str]], body: Any, prefer: str) -> List[Dict[str, Any]]:
+        query = dict(params)
+        items = body if isinstance(body, list) else [body]
+        key = PRIMARY_KEYS.get(table, "id")
+        conflict = query.get("on_conflict", key).split(",")
+        upsert = "resolution=" in prefer
+        created, added = [], []
+        rows = self.rows(table)
+        for item in items:
+            existing = None
+            if upsert and all(item.get(c) is not None for c in conflict):
+                existing = next((r for r in rows if all(r.get(c) == item.get(c) for c in conflict)), None)
+            if existing is not None:
+                if "ignore-duplicates" in prefer:
+                    continue
+                existing.update(item)
+                if table in UPDATED_AT_TABLES:
+                    existing["updated_at"] = _now()
+                created.append(dict(existing))
+                continue
+            if key == "id" and not item.get("id"):
+                item = {"id": str(uuid.uuid4()), **item}
+            elif any(r.get(key) == item.get(key) for r in (*rows, *added)):
+                raise UniqueViolation(f'duplicate key value violates unique constraint "{table}_pkey"')
+            row = {"created_at": _now(), **item}
+            if table in UPDATED_AT_TABLES:
+                row.setdefault("updated_at", row["created_at"])
+            added.append(row)
+            created.append(dict(row))
+        # Like a single INSERT statement, a failing row leaves none of the new rows behind
+        rows.extend(added)
+        if table in self._indexes:
+            self._indexes[table].update((str(row.get(key)), row) for row in added)
+        self._bump_versions(table, created)
+        return created
+
+    def _update(self, table: str, params: List[Tuple[str, str]], body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        check = self._filters(params)
+        updated = []
+        for row in self._candidates(table, params):
+            if check(row):
+                self._bump_versions(table, [row])
+                row.update(body)
+                if table in UPDATED_AT_TABLES:
+                    row["updated_at"] = _now()
+                updated.append(dict(row))
+        self._bump_versions(table, updated)
+        return updated
+
+    def _delete(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        check = self._filters(params)
+        kept, deleted = [], []
+        for row in self.rows(table):
+            (deleted if check(row) else kept).append(row)
+        self.tables[table] = kept
+        if deleted:
+            self._indexes.pop(table, None)
+        self._bump_versions(table, deleted)
+        return deleted
+
+    def _bump_versions(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        """What the triggers from migrations/008_collection_versions.sql do for written rows"""
+        column = VERSIONED_TABLES.get(table)
+        if column is None:
+            return
+        versions = self.rows("collection_versions")
+        for parent in {str(row[column]) for row in rows if row.get(column) is not None}:
+            entry = next((v for v in versions if v["collection"] == table and v["parent"] == parent), None)
+            if entry is None:
+                versions.append({"collection": table, "parent": parent, "version": 1})
+            else:
+                entry["version"] += 1
+
+    # Client wiring ----------------------------------------------------------
+
+    def client(self):
+        """Build a real async Supabase client whose PostgREST traffic hits this stub"""
+        from supabase import AsyncClient
+
+        client = AsyncClient("http://stub.local", "stub.stub.stub")
+        postgrest = client.postgrest
+        postgrest.session = httpx.AsyncClient(
+            base_url=str(postgrest.session.base_url),
+            headers=postgrest.session.headers,
+            transport=httpx.MockTransport(self.handle_async),
+        )
+        return client
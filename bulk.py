@@ -0,0 +1,155 @@
+import asyncio
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from postgrest.exceptions import APIError
+
+from cache import get_read_cache
+from dataloader import normalize_key
+from database import get_supabase
+from models import BulkItemResult, BulkResult
+
+# Rows per multi-row INSERT / DELETE statement
+BULK_CHUNK_SIZE = 500
+
+# Largest batch accepted by a single bulk request
+MAX_BULK_ITEMS = 10000
+
+# Statements in flight at once for a single bulk request
+BULK_CONCURRENCY = 4
+
+
+def chunked(items: Sequence[Any], size: int = BULK_CHUNK_SIZE) -> Iterator[Tuple[int, Sequence[Any]]]:
+    """Yield (offset, chunk) pairs covering items"""
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def check_batch_size(items: Sequence[Any]) -> None:
+    """Reject empty or oversized batches before touching the database"""
+    if not items:
+        raise HTTPException(status_code=422, detail="Batch must not be empty")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BULK_ITEMS} items")
+
+
+def summarize(results: List[BulkItemResult]) -> BulkResult:
+    """Wrap per-item results, sorted by request position, with totals"""
+    results = sorted(results, key=lambda result: result.index)
+    failed = sum(1 for result in results if result.status in ("error", "not_found"))
+    return BulkResult(succeeded=len(results) - failed, failed=failed, results=results)
+
+
+async def _gather_chunks(coroutines) -> List[BulkItemResult]:
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    chunks = await asyncio.gather(*(run(coroutine) for coroutine in coroutines))
+    return [result for chunk in chunks for result in chunk]
+
+
+def _row_rejected(error: Exception) -> bool:
+    """Whether PostgREST refused the statement over a row's data or a constraint (SQLSTATE class 22 or 23)"""
+    return isinstance(error, APIError) and str(error.code or "")[:2] in ("22", "23")
+
+
+async def _insert_chunk(
+    table: str, offset: int, rows: Sequence[Dict[str, Any]], key: str, on_conflict: Optional[str]
+) -> List[BulkItemResult]:
+    try:
+        query = get_supabase().table(table)
+        if on_conflict:
+            query = query.upsert(list(rows), on_conflict=on_conflict, default_to_null=False)
+        else:
+            query = query.insert(list(rows), default_to_null=False)
+        response = await query.execute()
+        return [
+            BulkItemResult(index=offset + i, id=row.get(key), status="created")
+            for i, row in enumerate(response.data)
+        ]
+    except Exception as e:
+        if len(rows) == 1 or not _row_rejected(e):
+            # A timeout or server error may have committed the chunk; retrying could duplicate rows
+            return [BulkItemResult(index=offset + i, status="error", error=str(e)) for i in range(len(rows))]
+    # One bad row fails the whole statement; retry row by row to isolate it
+    results = []
+    for i, row in enumerate(rows):
+        results.extend(await _insert_chunk(table, offset + i, [row], key, on_conflict))
+    return results
+
+
+async def bulk_insert(
+    table: str, rows: Sequence[Dict[str, Any]], key: str = "id", on_conflict: Optional[str] = None
+) -> BulkResult:
+    """Insert rows with chunked multi-row INSERTs, reporting a result per row.
+
+    With `on_conflict` (a comma-separated unique key), a row that collides with
+    a stored one updates it instead of failing.
+    """
+    results = await _gather_chunks(
+        _insert_chunk(table, offset, chunk, key, on_conflict) for offset, chunk in chunked(rows)
+    )
+    return summarize(results)
+
+
+async def _update_one(table: str, index: int, row_id: str, values: Dict[str, Any], key: str) -> List[BulkItemResult]:
+    try:
+        response = await get_supabase().table(table).update(values).eq(key, row_id).execute()
+    except Exception as e:
+        return [BulkItemResult(index=index, id=row_id, status="error", error=str(e))]
+    finally:
+        # A failed request may still have applied the update
+        await get_read_cache().invalidate(table, row_id)
+    status = "updated" if response.data else "not_found"
+    return [BulkItemResult(index=index, id=row_id, status=status)]
+
+
+async def bulk_update(table: str, updates: Sequence[Tuple[str, Dict[str, Any]]], key: str = "id") -> BulkResult:
+    """Apply per-row partial updates, overlapping the round-trips.
+
+    PostgREST has no multi-row UPDATE with per-row values, and an upsert would
+    re-create rows deleted in the meantime, so each row gets its own PATCH.
+    """
+    results = await _gather_chunks(
+        _update_one(table, index, row_id, values, key)
+        for index, (row_id, values) in enumerate(updates)
+    )
+    return summarize(results)
+
+
+async def _delete_chunk(table: str, offset: int, ids: Sequence[str], key: str) -> List[BulkItemResult]:
+    try:
+        response = await get_supabase().table(table).delete().in_(key, list(ids)).execute()
+    except Exception as e:
+        if len(ids) == 1 or not _row_rejected(e):
+            return [
+                BulkItemResult(index=offset + i, id=row_id, status="error", error=str(e))
+                for i, row_id in enumerate(ids)
+            ]
+    else:
+        deleted = {normalize_key(str(row[key])) for row in response.data}
+        return [
+            BulkItemResult(
+                index=offset + i, id=row_id, status="deleted" if normalize_key(row_id) in deleted else "not_found"
+            )
+            for i, row_id in enumerate(ids)
+        ]
+    finally:
+        await get_read_cache().invalidate_many(table, ids)
+    # One row still referenced by a foreign key, or one malformed id, fails the whole
+    # statement; retry id by id so the others are deleted
+    results = []
+    for i, row_id in enumerate(ids):
+        results.extend(await _delete_chunk(table, offset + i, [row_id], key))
+    return results
+
+
+async def bulk_delete(table: str, ids: Sequence[str], key: str = "id") -> BulkResult:
+    """Delete rows by id with chunked `IN (...)` DELETEs"""
+    results = await _gather_chunks(
+        _delete_chunk(table, offset, chunk, key) for offset, chunk in chunked(ids)
+    )
+    return summarize(results)
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import get_settings
+from dataloader import get_loader, normalize_key
+
+# Seconds a cached row stays fresh, per table. Profiles and settings are read on
+# every page load and rarely change; applications and timelines move faster.
+TABLE_TTLS = {
+    "profiles": 300.0,
+    "user_settings": 300.0,
+    "cvs": 120.0,
+    "saved_searches": 120.0,
+    "jobs": 60.0,
+    "job_applications": 30.0,
+    "application_timeline": 30.0,
+}
+
+
+class CacheBackend:
+    """Storage behind the read cache.
+
+    Backends store JSON-compatible values under string keys with a TTL and
+    enforce their own size cap. A backend shared between worker processes makes
+    every delete visible to all of them, which is how invalidation is broadcast.
+    """
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, keys: List[str]) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU dictionary, capped by the approximate size of its values"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache table in a SQLite file shared by all workers on a node.
+
+    The file runs in WAL mode so readers in one worker do not block writers in
+    another. Queries run on the default thread pool to keep the event loop free.
+    Expired and least recently used entries are pruned every `prune_every` writes.
+    Hits only note the access time in memory; it is written back when pruning,
+    so a hit costs one SELECT and no write.
+    """
+
+    def __init__(self, path: str, max_bytes: int, prune_every: int = 100):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self.evictions = 0
+        self._writes = 0
+        self._touched: Dict[str, float] = {}
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS read_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS read_cache_accessed ON read_cache (accessed)")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _get(self, key: str) -> Optional[str]:
+        connection = self._connect()
+        now = time.time()
+        row = connection.execute(
+            "SELECT value FROM read_cache WHERE key = ? AND expires >= ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = now
+        return row[0]
+
+    def _set(self, key: str, value: str, ttl: float) -> None:
+        connection = self._connect()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO read_cache (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now + ttl, now),
+        )
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self._prune(connection, now)
+
+    def _prune(self, connection: sqlite3.Connection, now: float) -> None:
+        touched, self._touched = self._touched, {}
+        connection.executemany(
+            "UPDATE read_cache SET accessed = ? WHERE key = ?", [(accessed, key) for key, accessed in touched.items()]
+        )
+        connection.execute("DELETE FROM read_cache WHERE expires < ?", (now,))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM read_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        dropped = 0
+        for key, size in connection.execute("SELECT key, size FROM read_cache ORDER BY accessed").fetchall():
+            if excess <= 0:
+                break
+            connection.execute("DELETE FROM read_cache WHERE key = ?", (key,))
+            excess -= size
+            dropped += 1
+        self.evictions += dropped
+
+    def _delete(self, keys: List[str]) -> None:
+        self._connect().executemany("DELETE FROM read_cache WHERE key = ?", [(key,) for key in keys])
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = await asyncio.to_thread(self._get, key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        encoded = json.dumps(value, default=str)
+        if len(encoded) <= self.max_bytes:
+            await asyncio.to_thread(self._set, key, encoded, ttl)
+
+    async def delete(self, keys: List[str]) -> None:
+        if keys:
+            await asyncio.to_thread(self._delete, keys)
+
+    def stats(self) -> Dict[str, Any]:
+        entries, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM read_cache"
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class ReadCache:
+    """Cache of database rows keyed by (table, primary key) with per-table TTLs.
+
+    Storage is delegated to a CacheBackend; hit and miss counters are kept per
+    process and per table. Keys that are UUIDs are stored in canonical form, so
+    an id written in upper case invalidates the same entry it was cached under.
+    A row loaded while its key was invalidated is not stored (see `generation`);
+    invalidations from other workers are only covered by the TTL.
+    """
+
+    def __init__(self, backend: CacheBackend, default_ttl: float, table_ttls: Optional[Dict[str, float]] = None):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.table_ttls = table_ttls or {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        # Entry key -> times it was invalidated; only keys with a load in progress are tracked
+        self._generations: Dict[str, int] = {}
+        self._loading: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(table: str, key: str) -> str:
+        return f"{table}:{normalize_key(key)}"
+
+    async def get(self, table: str, key: str) -> Optional[Dict[str, Any]]:
+        row = await self.backend.get(self._key(table, key))
+        counters = self.misses if row is None else self.hits
+        counters[table] = counters.get(table, 0) + 1
+        return row
+
+    def generation(self, table: str, key: str) -> int:
+        """Start loading `key`: pass the result to `set`, then call `release` whatever happens"""
+        entry = self._key(table, key)
+        self._loading[entry] = self._loading.get(entry, 0) + 1
+        return self._generations.setdefault(entry, 0)
+
+    def release(self, table: str, key: str) -> None:
+        """Finish a load started with `generation`"""
+        entry = self._key(table, key)
+        self._loading[entry] -= 1
+        if not self._loading[entry]:
+            del self._loading[entry]
+            del self._generations[entry]
+
+    async def set(self, table: str, key: str, row: Dict[str, Any], generation: Optional[int] = None) -> None:
+        """Store a row, unless it was invalidated since `generation` was taken"""
+        entry = self._key(table, key)
+        if generation is not None and self._generations.get(entry) != generation:
+            return
+        await self.backend.set(entry, row, self.table_ttls.get(table, self.default_ttl))
+
+    def _bump(self, entries: List[str]) -> None:
+        for entry in entries:
+            if entry in self._generations:
+                self._generations[entry] += 1
+
+    async def invalidate(self, table: str, key: str) -> None:
+        entries = [self._key(table, key)]
+        self._bump(entries)
+        await self.backend.delete(entries)
+
+    async def invalidate_many(self, table: str, keys: Iterable[str]) -> None:
+        entries = [self._key(table, key) for key in keys]
+        self._bump(entries)
+        await self.backend.delete(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        tables = sorted(set(self.hits) | set(self.misses))
+        return {
+            **self.backend.stats(),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "tables": {
+                table: {"hits": self.hits.get(table, 0), "misses": self.misses.get(table, 0)}
+                for table in tables
+            },
+        }
+
+
+def create_backend() -> CacheBackend:
+    """Build the cache backend selected by CACHE_BACKEND"""
+    settings = get_settings()
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryBackend(settings.CACHE_MAX_BYTES)
+    if settings.CACHE_BACKEND == "sqlite":
+        path = settings.CACHE_SQLITE_PATH or os.path.join(tempfile.gettempdir(), "job-tracker-read-cache.sqlite3")
+        return SQLiteBackend(path, settings.CACHE_MAX_BYTES)
+    raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+
+
+@lru_cache(maxsize=None)
+def get_read_cache() -> ReadCache:
+    """The worker's read cache, built from the settings on first use"""
+    return ReadCache(create_backend(), get_settings().CACHE_DEFAULT_TTL, TABLE_TTLS)
+
+
+def _project(row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+    if columns == "*":
+        return row
+    return {column: row[column] for column in columns.split(",") if column in row}
+
+
+async def get_row(table: str, key: str, columns: str = "*", key_column: str = "id") -> Optional[Dict[str, Any]]:
+    """Read one row by primary key, serving it from the read cache when possible.
+
+    Only full rows are cached; a narrower `columns` selection is answered from a
+    cached full row if there is one, and otherwise goes straight to the database.
+    Misses are batched with other by-key reads of the table in the same tick
+    into one `IN` query (`dataloader.py`). A row whose key is invalidated while
+    it is being loaded is returned but not cached.
+    """
+    if not get_settings().CACHE_ENABLED:
+        return await get_loader(table, key_column).load(key, columns)
+    read_cache = get_read_cache()
+    row = await read_cache.get(table, key)
+    if row is not None:
+        return _project(row, columns)
+    if columns != "*":
+        return await get_loader(table, key_column).load(key, columns)
+    generation = read_cache.generation(table, key)
+    try:
+        row = await get_loader(table, key_column).load(key, columns)
+        if row is not None:
+            await read_cache.set(table, key, row, generation)
+    finally:
+        read_cache.release(table, key)
+    return row
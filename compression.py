@@ -0,0 +1,243 @@
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip is offered without it
+    brotli = None
+
+# Content types worth compressing; everything else (images, PDFs, ...) passes through
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings this server can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """Best of `encodings` for an Accept-Encoding header, by q-value and then our preference"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a complete body"""
+    settings = get_settings()
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes each chunk so streamed rows reach the client"""
+
+    def __init__(self, encoding: str):
+        settings = get_settings()
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+def body_digest(body: bytes) -> str:
+    """Key of an uncompressed body in CompressedBodyCache"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (body digest, encoding), capped by their total size.
+
+    Entries are keyed on a hash of the uncompressed body rather than its ETag:
+    collection ETags come from version counters, not from the body, and two
+    bodies sharing one must not share a compressed copy. Hashing is far cheaper
+    than compressing, so hot resources are still compressed once.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, digest: str, encoding: str) -> Optional[bytes]:
+        body = self._entries.get((digest, encoding))
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((digest, encoding))
+        self.hits += 1
+        return body
+
+    def set(self, digest: str, encoding: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop((digest, encoding), None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[(digest, encoding)] = body
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_compressed_cache() -> CompressedBodyCache:
+    """The worker's compressed body cache, sized from the settings on first use"""
+    return CompressedBodyCache(get_settings().COMPRESSION_CACHE_MAX_BYTES)
+
+
+class CompressionMiddleware:
+    """Compress text and JSON responses with brotli or gzip, as negotiated.
+
+    Complete bodies shorter than `minimum_size` are sent as they are. Bodies
+    that carry an ETag (cacheable GETs) are looked up in `cache` by their
+    digest first, and their tag is weakened since the encoded bytes
+    differ from the tagged representation. Streamed responses are compressed
+    chunk by chunk. Compressible responses get `Vary: Accept-Encoding` whether
+    or not they were compressed. Unset arguments come from the COMPRESSION_*
+    settings; with COMPRESSION_ENABLED off every response passes through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        cache: Optional[CompressedBodyCache] = None,
+        enabled: Optional[bool] = None,
+    ):
+        settings = get_settings()
+        self.app = app
+        self.enabled = settings.COMPRESSION_ENABLED if enabled is None else enabled
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        self.cache = get_compressed_cache() if cache is None else cache
+        self.encodings = supported_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        start: List[Message] = []
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                eligible = (
+                    200 <= message["status"] < 300
+                    and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                    and "content-encoding" not in headers
+                )
+                if eligible:
+                    headers.add_vary_header("Accept-Encoding")
+                elif message["status"] == 304 and encoding is not None:
+                    # Revalidating a compressed response; keep the tag the client holds
+                    _weaken_etag(headers)
+                if not eligible or encoding is None:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start.append(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None and not more_body:
+                await send_complete(body)
+                return
+            if compressor is None:
+                compressor = StreamCompressor(encoding)
+                headers = MutableHeaders(raw=start[0]["headers"])
+                headers["Content-Encoding"] = encoding
+                del headers["content-length"]
+                _weaken_etag(headers)
+                await send(start[0])
+            chunk = compressor.chunk(body) if more_body else compressor.chunk(body) + compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        async def send_complete(body: bytes) -> None:
+            response_start = start[0]
+            if len(body) < self.minimum_size:
+                await send(response_start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            headers = MutableHeaders(raw=response_start["headers"])
+            digest = body_digest(body) if "etag" in headers else None
+            compressed = self.cache.get(digest, encoding) if digest is not None else None
+            if compressed is None:
+                compressed = compress(body, encoding)
+                if digest is not None:
+                    self.cache.set(digest, encoding, compressed)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            _weaken_etag(headers)
+            await send(response_start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
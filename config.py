@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,44 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: str
     SUPABASE_JWT_SECRET: str
+    # Read cache for by-id lookups
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "sqlite" (shared by workers)
+    CACHE_SQLITE_PATH: str = ""  # defaults to a file in the system temp directory
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_DEFAULT_TTL: float = 60.0
+    # Background task queue for post-write side effects
+    TASK_QUEUE_SIZE: int = 1000
+    TASK_WORKERS: int = 4
+    TASK_MAX_RETRIES: int = 3
+    TASK_RETRY_DELAY: float = 0.5  # seconds, doubled on each retry
+    TASK_ENQUEUE_TIMEOUT: float = 1.0  # seconds to wait for room before running inline
+    # Admin endpoints and opt-in request profiling
+    ADMIN_TOKEN: str = ""  # admin endpoints and the X-Profile header are disabled when empty
+    PROFILING_SAMPLE_RATE: float = 0.0  # fraction of requests profiled without the header
+    PROFILING_MAX_PROFILES: int = 50
+    # Validate database rows against the response model before encoding; off trusts PostgREST output as is
+    RESPONSE_VALIDATION: bool = True
+    # gzip/brotli response compression; brotli is offered when the package is installed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    # PostgREST HTTP connection pool
+    DB_MAX_CONNECTIONS: int = 100
+    DB_MAX_KEEPALIVE_CONNECTIONS: int = 20  # idle connections kept open for reuse
+    DB_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    DB_HTTP2: bool = True  # multiplex concurrent requests over one connection
+    DB_TIMEOUT: float = 120.0  # seconds per read/write
+    DB_CONNECT_TIMEOUT: float = 10.0
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection when the pool is full
+    # By-id reads batched into IN queries
+    LOADER_MAX_BATCH_SIZE: int = 100  # ids per query, keeping the URL well under proxy limits
+    LOADER_BATCH_WINDOW: float = 0.0  # seconds to collect ids; 0 batches within one event-loop tick
+    # Concurrent PostgREST reads at startup to open pooled connections; HTTP/2 shares one (0 disables)
+    STARTUP_WARMUP_CONNECTIONS: int = 4
+    STARTUP_WARMUP_TIMEOUT: float = 5.0  # seconds; startup continues without a warm pool after it
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -13,4 +53,7 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Settings read from the environment and .env on first use"""
+    return Settings()
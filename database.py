@@ -1,4 +1,7 @@
+import asyncio
+import logging
 import os
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional
 
 # Disable proxy for Supabase connections before importing libraries
 os.environ['NO_PROXY'] = '*'
@@ -12,13 +15,140 @@ if 'http_proxy' in os.environ:
 if 'https_proxy' in os.environ:
     del os.environ['https_proxy']
 
-from supabase import create_client, Client
-from config import settings
+from config import get_settings
+from metrics import registry
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+if TYPE_CHECKING:
+    import httpx
+    from supabase import AsyncClient
 
+logger = logging.getLogger(__name__)
 
-def get_supabase() -> Client:
-    """Get Supabase client instance"""
-    return supabase
+# The async Supabase client is created on first use (the app's lifespan), not at
+# import, so importing the app neither loads the supabase stack nor reads the
+# settings. Queries built from it must be awaited (`await query.execute()`) so
+# PostgREST round-trips never block the event loop.
+_supabase: Optional["AsyncClient"] = None
+
+
+def create_http_session(base_url: str, headers: Mapping[str, str]) -> "httpx.AsyncClient":
+    """HTTP client for PostgREST with the configured pool size, keep-alive, HTTP/2 and timeouts"""
+    import httpx
+
+    settings = get_settings()
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        limits=httpx.Limits(
+            max_connections=settings.DB_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.DB_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.DB_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.DB_TIMEOUT, connect=settings.DB_CONNECT_TIMEOUT, pool=settings.DB_POOL_TIMEOUT
+        ),
+        http2=settings.DB_HTTP2,
+        follow_redirects=True,
+    )
+
+
+def get_supabase() -> "AsyncClient":
+    """Get Supabase client instance, creating it on first use"""
+    global _supabase
+    if _supabase is None:
+        from supabase import AsyncClient
+
+        settings = get_settings()
+        client = AsyncClient(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        # supabase builds the PostgREST session with library defaults; swap in the tuned one
+        default_session = client.postgrest.session
+        client.postgrest.session = create_http_session(str(default_session.base_url), default_session.headers)
+        _supabase = client
+    return _supabase
+
+
+def set_supabase(client: "AsyncClient") -> None:
+    """Replace the shared client, e.g. with one pointed at a local PostgREST for benchmarks"""
+    global _supabase
+    _supabase = client
+
+
+async def close_supabase() -> None:
+    """Close the pooled HTTP connections held by the Supabase client"""
+    if _supabase is not None:
+        await _supabase.postgrest.aclose()
+
+
+async def warm_up(connections: int, timeout: float) -> int:
+    """Send `connections` one-row PostgREST reads concurrently; returns how many succeeded.
+
+    Over HTTP/1.1 each concurrent probe opens its own pooled connection. When
+    HTTP/2 is negotiated (DB_HTTP2 against an https URL) the probes are
+    multiplexed over a single connection, which is all concurrent requests
+    need then. Either way the first requests after startup find connections
+    (and TLS sessions) ready. Failures are logged, never raised.
+    """
+    if connections <= 0:
+        return 0
+
+    async def probe():
+        await get_supabase().table("profiles").select("id").limit(1).execute()
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(probe() for _ in range(connections)), return_exceptions=True), timeout
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Database warm-up timed out after %.1fs", timeout)
+        return 0
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.warning("Database warm-up: %d of %d probe(s) failed: %s", len(errors), connections, errors[0])
+    return connections - len(errors)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Limits and current use of the PostgREST connection pool"""
+    settings = get_settings()
+    stats: Dict[str, Any] = {
+        "max_connections": settings.DB_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.DB_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": settings.DB_KEEPALIVE_EXPIRY,
+        "http2": settings.DB_HTTP2,
+        "connections": 0,
+        "active": 0,
+        "idle": 0,
+        "http2_connections": 0,
+        "requests_active": 0,
+        "requests_queued": 0,
+        "utilization": 0.0,
+    }
+    # httpx keeps its httpcore pool private, so read it defensively
+    transport = getattr(_supabase.postgrest.session, "_transport", None) if _supabase is not None else None
+    pool = getattr(transport, "_pool", None)
+    if pool is None or not hasattr(pool, "connections"):
+        return stats
+    connections = [connection for connection in pool.connections if not connection.is_closed()]
+    requests = list(getattr(pool, "_requests", []))
+    queued = sum(1 for request in requests if request.is_queued())
+    idle = sum(1 for connection in connections if connection.is_idle())
+    stats.update(
+        connections=len(connections),
+        active=len(connections) - idle,
+        idle=idle,
+        http2_connections=sum(1 for connection in connections if "HTTP/2" in connection.info()),
+        requests_active=len(requests) - queued,
+        requests_queued=queued,
+        utilization=(len(connections) - idle) / settings.DB_MAX_CONNECTIONS if settings.DB_MAX_CONNECTIONS else 0.0,
+    )
+    return stats
+
+
+registry.gauge(
+    "db_pool_connections", "PostgREST pool connections by state", ("state",),
+    lambda: {(state,): pool_stats()[state] for state in ("active", "idle")},
+)
+registry.gauge(
+    "db_pool_requests", "PostgREST requests holding or waiting for a pooled connection", ("state",),
+    lambda: {(state,): pool_stats()[f"requests_{state}"] for state in ("active", "queued")},
+)
@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+from config import get_settings
+from database import get_supabase
+from singleflight import reads
+
+
+def normalize_key(key: str) -> str:
+    """A key as PostgREST returns it: canonical lowercase for UUIDs, anything else unchanged"""
+    try:
+        return str(uuid.UUID(key))
+    except (ValueError, TypeError, AttributeError):
+        return key
+
+
+class DataLoader:
+    """Batch by-key reads of one table into `IN (...)` queries.
+
+    Keys requested in the same event-loop tick, or within `window` seconds of
+    the first one, are fetched with one query per column selection; a batch is
+    sent early once it holds `max_batch_size` keys. A batch PostgREST rejects is
+    retried key by key, so one malformed key does not fail the others. Loads go
+    through the shared single-flight layer, so a key already being fetched is
+    not requested again, and writes to the table stop later loads from joining
+    earlier fetches.
+    """
+
+    def __init__(self, table: str, key_column: str = "id", max_batch_size: int = 100, window: float = 0.0):
+        self.table = table
+        self.key_column = key_column
+        self.max_batch_size = max_batch_size
+        self.window = window
+        # columns -> key -> future of the row (None when missing)
+        self._batches: Dict[str, Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"]] = {}
+        self.batches = 0
+        self.keys = 0
+
+    async def load(self, key: str, columns: str = "*") -> Optional[Dict[str, Any]]:
+        """The row whose key column equals `key`, or None"""
+        flight_key = (f"/{self.table}", "load", self.key_column, key, columns)
+        return await reads.do(flight_key, lambda: self._enqueue(key, columns))
+
+    async def _enqueue(self, key: str, columns: str) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(columns)
+        if batch is None:
+            batch = self._batches[columns] = {}
+            if self.window > 0:
+                loop.call_later(self.window, self._dispatch, columns, batch)
+            else:
+                loop.call_soon(self._dispatch, columns, batch)
+        future = batch.get(key)
+        if future is None:
+            future = batch[key] = loop.create_future()
+        if len(batch) >= self.max_batch_size:
+            self._dispatch(columns, batch)
+        return await future
+
+    def _dispatch(self, columns: str, batch: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"]) -> None:
+        # A batch sent early when full is still scheduled; only send the current one
+        if self._batches.get(columns) is not batch:
+            return
+        del self._batches[columns]
+        asyncio.ensure_future(self._fetch(columns, batch))
+
+    async def _fetch(self, columns: str, batch: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"]) -> None:
+        self.batches += 1
+        self.keys += len(batch)
+        selected = columns.split(",")
+        extra_key = columns != "*" and self.key_column not in selected
+        try:
+            response = await (
+                get_supabase().table(self.table)
+                .select(f"{columns},{self.key_column}" if extra_key else columns)
+                .in_(self.key_column, list(batch))
+                .execute()
+            )
+        except Exception as error:
+            if isinstance(error, APIError) and len(batch) > 1:
+                # PostgREST rejected the query, e.g. over one id that is not a valid UUID;
+                # fetch the keys one by one so a bad key only fails its own load
+                await asyncio.gather(*(self._fetch(columns, {key: future}) for key, future in batch.items()))
+                return
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        rows = {normalize_key(str(row.get(self.key_column))): row for row in response.data}
+        for key, future in batch.items():
+            row = rows.get(normalize_key(key))
+            if row is not None and extra_key:
+                row = {column: value for column, value in row.items() if column != self.key_column}
+            if not future.done():
+                future.set_result(row)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "keys": self.keys,
+            "mean_batch_size": self.keys / self.batches if self.batches else 0.0,
+        }
+
+
+_loaders: Dict[Tuple[str, str], DataLoader] = {}
+
+
+def get_loader(table: str, key_column: str = "id") -> DataLoader:
+    """The shared loader for a table and key column"""
+    loader = _loaders.get((table, key_column))
+    if loader is None:
+        settings = get_settings()
+        loader = _loaders[(table, key_column)] = DataLoader(
+            table, key_column, settings.LOADER_MAX_BATCH_SIZE, settings.LOADER_BATCH_WINDOW
+        )
+    return loader
+
+
+def loader_stats() -> Dict[str, Any]:
+    loaders: List[DataLoader] = list(_loaders.values())
+    batches, keys = sum(loader.batches for loader in loaders), sum(loader.keys for loader in loaders)
+    return {
+        "batches": batches,
+        "keys": keys,
+        "mean_batch_size": keys / batches if batches else 0.0,
+        "tables": {f"{table}.{key_column}": loader.stats() for (table, key_column), loader in _loaders.items()},
+    }
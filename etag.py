@@ -0,0 +1,112 @@
+import hashlib
+from typing import List, Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database import get_supabase
+from dataloader import normalize_key
+from singleflight import add_derived_table, execute_read
+
+# Version counter per (collection, parent), kept by triggers from migrations/008_collection_versions.sql
+VERSIONS_TABLE = "collection_versions"
+add_derived_table(VERSIONS_TABLE, ("job_applications", "application_timeline"))
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong entity tag derived from the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header value"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+async def collection_etag(request: Request, table: str, value: str) -> str:
+    """Tag for the list of `table` rows belonging to parent `value`, found without running the list query.
+
+    It covers the parent's version counter, which every insert, update and
+    delete bumps (migrations/008_collection_versions.sql), and the query
+    string, so each page and column selection has its own tag.
+    """
+    response = await execute_read(
+        get_supabase().table(VERSIONS_TABLE).select("version")
+        .eq("collection", table).eq("parent", normalize_key(value))
+    )
+    version = response.data[0]["version"] if response.data else 0
+    return compute_etag(f"{request.url.path}?{request.url.query}|{version}".encode())
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A bodiless 304 when the request's If-None-Match carries `etag`"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+class ETagMiddleware:
+    """Add ETags to successful JSON GET responses and answer conditional GETs.
+
+    The body is hashed after the endpoint has rendered it, so the tag changes
+    exactly when the representation does. When the client's If-None-Match
+    carries the current tag, a bodiless 304 is returned in place of the body.
+    Streaming (non-JSON) responses, and responses whose endpoint already set
+    an ETag (see collection_etag), pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: List[Message] = []
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                eligible = (
+                    message["status"] == 200
+                    and headers.get("content-type", "").startswith("application/json")
+                    and "etag" not in headers
+                )
+                if not eligible:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start.append(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = compute_etag(body)
+            response_start = start[0]
+            headers = MutableHeaders(raw=response_start["headers"])
+            headers["ETag"] = etag
+            if if_none_match and etag_matches(etag, if_none_match):
+                del headers["content-type"]
+                del headers["content-length"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
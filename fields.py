@@ -0,0 +1,29 @@
+from typing import Optional, Sequence, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+
+
+class FieldSelection:
+    """Dependency turning a `fields=a,b,c` query parameter into a select() column list.
+
+    Requested names are checked against the response model, and the columns the
+    endpoint itself relies on (primary key, pagination key) are always included.
+    Without `fields` every column is selected.
+    """
+
+    def __init__(self, model: Type[BaseModel], required: Sequence[str] = ("id", "created_at")):
+        self.model = model
+        self.required = tuple(required)
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    ) -> str:
+        if not fields:
+            return "*"
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in self.model.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        return ",".join(dict.fromkeys([*self.required, *requested]))
@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bulk import BULK_CONCURRENCY, bulk_insert, bulk_update, chunked
+from database import get_supabase
+from models import BulkItemResult, JobCreate, JobIngestResult
+
+# job_url values per lookup query; URLs are long and the filter goes in the query string
+LOOKUP_CHUNK_SIZE = 50
+
+# Fields that change on every scrape and do not make a job "changed" on their own
+VOLATILE_FIELDS = {"date_scraped"}
+
+# Columns of the unique index new jobs with a user_id are upserted on (migrations/004_jobs_ingest_key.sql)
+INGEST_KEY = "user_id,job_url"
+
+IngestKey = Tuple[Optional[str], str]
+
+
+def _key(row: Dict[str, Any]) -> IngestKey:
+    return row.get("user_id"), row["job_url"]
+
+
+def changed_fields(incoming: Dict[str, Any], existing: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the incoming values that differ from the stored row.
+
+    Both sides are normalized through JobCreate so that e.g. timestamps compare
+    equal regardless of their string formatting. Volatile fields are only
+    written along with a real change.
+    """
+    current = JobCreate.model_validate(existing).model_dump(mode="json")
+    changes = {
+        name: value
+        for name, value in incoming.items()
+        if name not in VOLATILE_FIELDS and current.get(name) != value
+    }
+    if changes:
+        changes.update({name: incoming[name] for name in VOLATILE_FIELDS if name in incoming})
+    return changes
+
+
+async def _lookup_existing(keys: Sequence[IngestKey]) -> Dict[IngestKey, Dict[str, Any]]:
+    """Fetch stored jobs matching the (user_id, job_url) keys, in chunks"""
+    urls = sorted({url for _, url in keys})
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def fetch(chunk):
+        async with semaphore:
+            response = await get_supabase().table("jobs").select("*").in_("job_url", list(chunk)).execute()
+            return response.data
+
+    pages = await asyncio.gather(*(fetch(chunk) for _, chunk in chunked(urls, LOOKUP_CHUNK_SIZE)))
+    wanted = set(keys)
+    existing = {}
+    for rows in pages:
+        for row in rows:
+            if _key(row) in wanted:
+                existing[_key(row)] = row
+    return existing
+
+
+def _reindex(results: List[BulkItemResult], indexes: List[int]) -> List[BulkItemResult]:
+    return [result.model_copy(update={"index": indexes[result.index]}) for result in results]
+
+
+async def ingest_jobs(jobs: Sequence[JobCreate]) -> JobIngestResult:
+    """Idempotently ingest scraped jobs keyed on (user_id, job_url).
+
+    New jobs are inserted in bulk, jobs whose content changed get only their
+    changed fields updated, and unchanged jobs cost no write at all. When the
+    same key appears more than once in a batch the last occurrence wins. New
+    jobs are upserted on the unique (user_id, job_url) index, so a job another
+    ingest inserted since the lookup is updated rather than duplicated. Jobs
+    without a user_id are only covered by a partial index, which an upsert
+    cannot target; they are inserted, and one racing another ingest fails with
+    a unique violation instead of being stored twice.
+    """
+    results: List[BulkItemResult] = []
+    latest: Dict[IngestKey, Tuple[int, Dict[str, Any]]] = {}
+    for index, job in enumerate(jobs):
+        row = job.model_dump(mode="json", exclude_unset=True)
+        if not row.get("job_url"):
+            results.append(BulkItemResult(index=index, status="error", error="job_url is required"))
+            continue
+        previous = latest.get(_key(row))
+        if previous is not None:
+            results.append(
+                BulkItemResult(index=previous[0], status="duplicate", error=f"superseded by item {index}")
+            )
+        latest[_key(row)] = (index, row)
+
+    existing = await _lookup_existing(list(latest))
+
+    new_rows, new_indexes = [], []
+    unowned_rows, unowned_indexes = [], []
+    updates, update_indexes = [], []
+    for key, (index, row) in latest.items():
+        stored = existing.get(key)
+        if stored is None:
+            if row.get("user_id") is None:
+                unowned_rows.append(row)
+                unowned_indexes.append(index)
+            else:
+                new_rows.append(row)
+                new_indexes.append(index)
+            continue
+        changes = changed_fields(row, stored)
+        if changes:
+            updates.append((stored["id"], changes))
+            update_indexes.append(index)
+        else:
+            results.append(BulkItemResult(index=index, id=stored["id"], status="unchanged"))
+
+    if new_rows:
+        results.extend(_reindex((await bulk_insert("jobs", new_rows, on_conflict=INGEST_KEY)).results, new_indexes))
+    if unowned_rows:
+        results.extend(_reindex((await bulk_insert("jobs", unowned_rows)).results, unowned_indexes))
+    if updates:
+        results.extend(_reindex((await bulk_update("jobs", updates)).results, update_indexes))
+
+    results.sort(key=lambda result: result.index)
+    counts = {
+        status: sum(1 for result in results if result.status == status)
+        for status in ("created", "updated", "unchanged")
+    }
+    failed = sum(1 for result in results if result.status in ("error", "not_found"))
+    return JobIngestResult(succeeded=len(results) - failed, failed=failed, results=results, **counts)
@@ -0,0 +1,34 @@
+from typing import Any, Dict, Optional
+
+from pydantic import ValidationError
+
+from models import JobFilters
+
+
+def apply_job_filters(query, filters: JobFilters):
+    """Apply job filters to a query on the jobs table"""
+    if filters.user_id:
+        query = query.eq("user_id", filters.user_id)
+    if filters.company:
+        query = query.ilike("company", f"%{filters.company}%")
+    if filters.location:
+        query = query.ilike("location", f"%{filters.location}%")
+    if filters.job_type:
+        query = query.eq("job_type", filters.job_type)
+    if filters.is_remote is not None:
+        query = query.eq("is_remote", filters.is_remote)
+    if filters.status:
+        query = query.eq("status", filters.status)
+    return query
+
+
+def compile_search_params(search_params: Optional[Dict[str, Any]]) -> JobFilters:
+    """Turn a saved search's search_params into job filters.
+
+    search_params uses the same keys as the GET /jobs/ query parameters; other
+    keys are ignored. Raises ValueError when a value has the wrong type.
+    """
+    try:
+        return JobFilters.model_validate(search_params or {})
+    except ValidationError as e:
+        raise ValueError(f"Invalid search_params: {e.errors()[0]['loc'][0]}: {e.errors()[0]['msg']}")
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from routers import (
     profiles,
@@ -8,15 +10,59 @@ from routers import (
     application_timeline,
     user_settings,
     saved_searches,
+    users,
+    admin,
 )
+from cache import get_read_cache
+from compression import CompressionMiddleware, get_compressed_cache
+from config import get_settings
+from dataloader import loader_stats
+from database import close_supabase, get_supabase, pool_stats, warm_up
+from etag import ETagMiddleware
+from metrics import PROMETHEUS_MEDIA_TYPE, MetricsMiddleware, instrument_http_client, registry
+from pagination import NEXT_CURSOR_HEADER
+from profiling import ProfilingMiddleware
+from singleflight import reads, track_writes
+from tasks import get_task_queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    # Settings and the client are built on first use; importing the app reads neither
+    settings = get_settings()
+    instrument_http_client(get_supabase().postgrest.session)
+    track_writes(get_supabase().postgrest.session)
+    get_task_queue().start()
+    await warm_up(settings.STARTUP_WARMUP_CONNECTIONS, settings.STARTUP_WARMUP_TIMEOUT)
+    yield
+    await get_task_queue().stop()
+    await close_supabase()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Job Application Tracker API",
     description="RESTful API for managing job applications, CVs, and user profiles",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Middleware is built on the first request, so each one reads its settings then, not at import.
+
+# Opt-in cProfile of single requests (X-Profile header or sampling), see /admin/profiles
+app.add_middleware(ProfilingMiddleware)
+
+# Tag JSON GET responses and answer If-None-Match with 304 Not Modified
+app.add_middleware(ETagMiddleware)
+
+# gzip/brotli for large bodies unless COMPRESSION_ENABLED is off; outside the ETag middleware
+# so tags hash the uncompressed body
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency, database time and response size, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -28,6 +74,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include routers
@@ -38,6 +85,8 @@ app.include_router(job_applications.router)
 app.include_router(application_timeline.router)
 app.include_router(user_settings.router)
 app.include_router(saved_searches.router)
+app.include_router(users.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -56,6 +105,35 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Read cache and compressed body cache counters and size, coalesced reads and batched by-id reads"""
+    return {
+        **get_read_cache().stats(),
+        "compressed_bodies": get_compressed_cache().stats(),
+        "coalesced_reads": reads.stats(),
+        "batched_reads": loader_stats(),
+    }
+
+
+@app.get("/tasks/stats")
+async def task_stats():
+    """Background task queue depth, outcomes and latency"""
+    return get_task_queue().stats()
+
+
+@app.get("/db/stats")
+async def db_stats():
+    """PostgREST connection pool limits, connections in use and queued requests"""
+    return pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    return Response(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from bulk import chunked
+from database import get_supabase
+from job_filters import compile_search_params
+from pagination import iter_pages
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the saved search index is reloaded from the database
+INDEX_TTL = 60.0
+
+# user_settings rows per `IN (...)` lookup while building the index
+SETTINGS_CHUNK_SIZE = 100
+
+_SALARY_NUMBER = re.compile(r"(\d+(?:[.,]\d+)*)\s*([kK])?")
+
+
+def parse_salary(text: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Parse a free-text salary such as "$80,000 - $100,000" or "90k" into a range"""
+    if not text:
+        return None
+    amounts = []
+    for number, thousands in _SALARY_NUMBER.findall(text):
+        value = float(number.replace(",", ""))
+        amounts.append(value * 1000 if thousands else value)
+    amounts = [amount for amount in amounts if amount >= 1000]
+    if not amounts:
+        return None
+    return min(amounts), max(amounts)
+
+
+def _trigrams(text: str) -> set:
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _EqualityIndex:
+    """Bitmask of searches per required value, plus searches that accept any value"""
+
+    def __init__(self):
+        self.any = 0
+        self.by_value: Dict[Any, int] = defaultdict(int)
+
+    def add(self, bit: int, value: Any) -> None:
+        if value is None or value == "":
+            self.any |= bit
+        else:
+            self.by_value[value] |= bit
+
+    def candidates(self, value: Any) -> int:
+        return self.any | self.by_value.get(value, 0)
+
+
+class _SubstringIndex:
+    """Bitmask of searches per trigram of their `ilike %pattern%` filter.
+
+    A job can only contain a pattern if it contains every trigram of it, so each
+    search is filed under one of its trigrams and looked up through the job's
+    trigrams. Patterns shorter than three characters accept any job here and are
+    settled by the final check.
+    """
+
+    def __init__(self):
+        self.any = 0
+        self.by_trigram: Dict[str, int] = defaultdict(int)
+
+    def add(self, bit: int, pattern: Optional[str]) -> None:
+        grams = sorted(_trigrams(pattern or ""))
+        if not grams:
+            self.any |= bit
+        else:
+            self.by_trigram[grams[0]] |= bit
+
+    def candidates(self, value: Optional[str]) -> int:
+        mask = self.any
+        for gram in _trigrams(value or ""):
+            mask |= self.by_trigram.get(gram, 0)
+        return mask
+
+
+class SavedSearchMatcher:
+    """Index of saved search predicates for matching many jobs in one pass.
+
+    Equality predicates (user_id, job_type, is_remote, status) and substring
+    predicates (company, location) are indexed as bitmasks over the searches, so
+    the candidate searches for a job are a handful of integer ANDs instead of a
+    loop over every search. Equality candidates are exact; the substring
+    filters and the owner's salary bounds from user_settings are then confirmed
+    for the remaining candidates only.
+    """
+
+    def __init__(
+        self,
+        searches: Sequence[Dict[str, Any]],
+        settings_by_user: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        settings_by_user = settings_by_user or {}
+        self.search_ids: List[str] = []
+        self.substrings: List[Tuple[str, str]] = []
+        self.salary_bounds: List[Tuple[Optional[int], Optional[int]]] = []
+        self.user_id = _EqualityIndex()
+        self.job_type = _EqualityIndex()
+        self.is_remote = _EqualityIndex()
+        self.status = _EqualityIndex()
+        self.company = _SubstringIndex()
+        self.location = _SubstringIndex()
+
+        for search in searches:
+            try:
+                filters = compile_search_params(search.get("search_params"))
+            except ValueError:
+                logger.warning("Skipping saved search %s with invalid search_params", search.get("id"))
+                continue
+            bit = 1 << len(self.search_ids)
+            self.search_ids.append(search["id"])
+            self.substrings.append(((filters.company or "").lower(), (filters.location or "").lower()))
+            settings = settings_by_user.get(search.get("user_id")) or {}
+            self.salary_bounds.append((settings.get("min_salary"), settings.get("max_salary")))
+            self.user_id.add(bit, filters.user_id)
+            self.job_type.add(bit, filters.job_type)
+            self.is_remote.add(bit, filters.is_remote)
+            self.status.add(bit, filters.status)
+            self.company.add(bit, filters.company)
+            self.location.add(bit, filters.location)
+
+    def __len__(self) -> int:
+        return len(self.search_ids)
+
+    def _salary_ok(self, index: int, salary: Optional[Tuple[float, float]]) -> bool:
+        minimum, maximum = self.salary_bounds[index]
+        if salary is None:
+            return True
+        low, high = salary
+        return (minimum is None or high >= minimum) and (maximum is None or low <= maximum)
+
+    def match_job(self, job: Dict[str, Any]) -> List[str]:
+        """Ids of the saved searches that a job satisfies"""
+        mask = (
+            self.user_id.candidates(job.get("user_id"))
+            & self.job_type.candidates(job.get("job_type"))
+            & self.is_remote.candidates(job.get("is_remote"))
+            & self.status.candidates(job.get("status"))
+        )
+        if mask:
+            mask &= self.company.candidates(job.get("company"))
+        if mask:
+            mask &= self.location.candidates(job.get("location"))
+        if not mask:
+            return []
+        salary = parse_salary(job.get("salary"))
+        company = (job.get("company") or "").lower()
+        location = (job.get("location") or "").lower()
+        matched = []
+        while mask:
+            low_bit = mask & -mask
+            index = low_bit.bit_length() - 1
+            mask ^= low_bit
+            company_pattern, location_pattern = self.substrings[index]
+            if company_pattern and company_pattern not in company:
+                continue
+            if location_pattern and location_pattern not in location:
+                continue
+            if self._salary_ok(index, salary):
+                matched.append(self.search_ids[index])
+        return matched
+
+    def match(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Map saved search id to the ids of the jobs in the batch it matches"""
+        results: Dict[str, List[str]] = defaultdict(list)
+        for job in jobs:
+            for search_id in self.match_job(job):
+                results[search_id].append(job["id"])
+        return dict(results)
+
+
+async def load_matcher() -> SavedSearchMatcher:
+    """Build a matcher over all notification-enabled saved searches"""
+
+    def build_query():
+        return (
+            get_supabase().table("saved_searches")
+            .select("id,created_at,user_id,search_params")
+            .eq("notification_enabled", True)
+        )
+
+    searches = [search async for page in iter_pages(build_query) for search in page]
+    user_ids = sorted({search["user_id"] for search in searches if search.get("user_id")})
+    settings_by_user = {}
+    for _, chunk in chunked(user_ids, SETTINGS_CHUNK_SIZE):
+        response = await (
+            get_supabase().table("user_settings")
+            .select("user_id,min_salary,max_salary")
+            .in_("user_id", list(chunk))
+            .execute()
+        )
+        settings_by_user.update({row["user_id"]: row for row in response.data})
+    return SavedSearchMatcher(searches, settings_by_user)
+
+
+_matcher: Optional[SavedSearchMatcher] = None
+_loaded_at = 0.0
+_load_lock = asyncio.Lock()
+
+
+def invalidate_matcher() -> None:
+    """Force the index to be rebuilt on next use, after saved search or settings writes"""
+    global _matcher
+    _matcher = None
+
+
+async def get_matcher() -> SavedSearchMatcher:
+    """Return the cached matcher, rebuilding it when stale"""
+    global _matcher, _loaded_at
+    async with _load_lock:
+        if _matcher is None or time.monotonic() - _loaded_at > INDEX_TTL:
+            _matcher = await load_matcher()
+            _loaded_at = time.monotonic()
+        return _matcher
+
+
+async def notify_new_jobs(jobs: Sequence[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Match freshly ingested jobs against notification-enabled saved searches.
+
+    Failures are logged rather than raised, so matching never fails the write
+    that triggered it.
+    """
+    if not jobs:
+        return {}
+    try:
+        matched = (await get_matcher()).match(jobs)
+    except Exception:
+        logger.exception("Saved search matching failed for %d job(s)", len(jobs))
+        return {}
+    for search_id, job_ids in matched.items():
+        logger.info("Saved search %s matched %d new job(s)", search_id, len(job_ids))
+    return matched
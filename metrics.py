@@ -0,0 +1,262 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+if TYPE_CHECKING:
+    import httpx
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000)
+
+# Path prefix of PostgREST requests, followed by the table or rpc/<function>
+REST_PREFIX = "/rest/v1/"
+
+_DB_OPERATIONS = {
+    "GET": "select",
+    "HEAD": "select",
+    "POST": "insert",
+    "PATCH": "update",
+    "PUT": "upsert",
+    "DELETE": "delete",
+}
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Gauge:
+    """Point-in-time values per label set, read from `collect` when rendered"""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], collect: Callable[[], Dict[Labels, float]]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set.
+
+    Observations only bump one bucket counter; the cumulative counts Prometheus
+    expects are summed when the metrics are rendered.
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _format_labels(self.labels, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative:g}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {series[-1]:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative:g}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[object] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(
+        self, name: str, help: str, labels: Sequence[str], collect: Callable[[], Dict[Labels, float]]
+    ) -> Gauge:
+        metric = Gauge(name, help, labels, collect)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from request to last body byte", ("method", "route"), LATENCY_BUCKETS
+)
+http_db_duration = registry.histogram(
+    "http_request_db_seconds", "Time spent waiting on the database per request", ("method", "route"), LATENCY_BUCKETS
+)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size", ("method", "route"), SIZE_BUCKETS
+)
+db_requests = registry.counter(
+    "db_requests_total", "Database round-trips by table, operation and status code", ("table", "operation", "status")
+)
+db_duration = registry.histogram(
+    "db_request_duration_seconds", "Database round-trip time until response headers", ("table", "operation"),
+    LATENCY_BUCKETS,
+)
+db_rows = registry.histogram(
+    "db_rows", "Rows returned or affected per database round-trip", ("table", "operation"), ROW_BUCKETS
+)
+
+# Accumulated database seconds of the request being handled, if any
+_request_db_time: ContextVar[Optional[List[float]]] = ContextVar("request_db_time", default=None)
+
+
+def _table_and_operation(request: "httpx.Request") -> Tuple[str, str]:
+    path = request.url.path
+    resource = path.split(REST_PREFIX, 1)[1] if REST_PREFIX in path else path.strip("/")
+    if resource.startswith("rpc/"):
+        return resource, "rpc"
+    return resource, _DB_OPERATIONS.get(request.method, request.method.lower())
+
+
+def _row_count(response: "httpx.Response") -> Optional[int]:
+    # PostgREST reports the returned range as "0-24/*" (or "*/0" when empty)
+    content_range = response.headers.get("content-range")
+    if not content_range:
+        return None
+    returned = content_range.split("/", 1)[0]
+    if "-" not in returned:
+        return 0
+    first, last = returned.split("-", 1)
+    try:
+        return int(last) - int(first) + 1
+    except ValueError:
+        return None
+
+
+async def _on_db_request(request: "httpx.Request") -> None:
+    request.extensions["metrics_started"] = time.perf_counter()
+
+
+async def _on_db_response(response: "httpx.Response") -> None:
+    started = response.request.extensions.get("metrics_started")
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    table, operation = _table_and_operation(response.request)
+    db_requests.inc((table, operation, str(response.status_code)))
+    db_duration.observe((table, operation), elapsed)
+    rows = _row_count(response)
+    if rows is not None:
+        db_rows.observe((table, operation), rows)
+    request_db_time = _request_db_time.get()
+    if request_db_time is not None:
+        request_db_time[0] += elapsed
+
+
+def request_db_seconds() -> float:
+    """Database time of the current request so far (0 outside MetricsMiddleware)"""
+    request_db_time = _request_db_time.get()
+    return request_db_time[0] if request_db_time is not None else 0.0
+
+
+def instrument_http_client(client: "httpx.AsyncClient") -> None:
+    """Time every round-trip made through an HTTP client (the PostgREST session)"""
+    if _on_db_request not in client.event_hooks["request"]:
+        client.event_hooks["request"].append(_on_db_request)
+        client.event_hooks["response"].append(_on_db_response)
+
+
+class MetricsMiddleware:
+    """Record latency, database time, response size and status per route template.
+
+    Routes are labelled by their template (`/jobs/{job_id}`), not the raw path,
+    so the number of series stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        db_time = [0.0]
+        token = _request_db_time.set(db_time)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_db_time.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            http_requests.inc(labels + (str(status_code),))
+            http_duration.observe(labels, time.perf_counter() - started)
+            http_db_duration.observe(labels, db_time[0])
+            http_response_size.observe(labels, size)
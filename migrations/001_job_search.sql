@@ -0,0 +1,43 @@
+-- Full-text search over jobs.
+--
+-- Indexes a weighted tsvector (title > company > description) with GIN and
+-- adds the search_jobs() function called by GET /jobs/search through Supabase
+-- RPC. The vector is an expression index rather than a stored column so that
+-- `select *` on jobs does not start shipping it. Trigram indexes make the
+-- existing `ilike '%term%'` filters on company and location indexable.
+
+create extension if not exists pg_trgm;
+
+create or replace function job_search_document(title text, company text, description text)
+returns tsvector
+language sql
+immutable
+as $$
+    select setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+           setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+           setweight(to_tsvector('english', coalesce(description, '')), 'C');
+$$;
+
+create index if not exists jobs_search_document_idx
+    on jobs using gin (job_search_document(title, company, description));
+create index if not exists jobs_company_trgm_idx on jobs using gin (company gin_trgm_ops);
+create index if not exists jobs_location_trgm_idx on jobs using gin (location gin_trgm_ops);
+
+create or replace function search_jobs(
+    search_query text,
+    filter_user_id text default null,
+    result_limit integer default 20,
+    result_offset integer default 0
+)
+returns table (job jsonb, rank real)
+language sql
+stable
+as $$
+    select to_jsonb(j), ts_rank_cd(job_search_document(j.title, j.company, j.description), query) as rank
+    from jobs j, websearch_to_tsquery('english', search_query) query
+    where job_search_document(j.title, j.company, j.description) @@ query
+      and (filter_user_id is null or j.user_id::text = filter_user_id)
+    order by rank desc, j.id
+    limit result_limit
+    offset result_offset;
+$$;
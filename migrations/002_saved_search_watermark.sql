@@ -0,0 +1,10 @@
+-- Incremental saved search runs.
+--
+-- POST /saved-searches/{id}/results/new returns only jobs scraped after the
+-- search's watermark and then advances it. The index serves the
+-- `date_scraped > watermark order by date_scraped, id` scan.
+
+alter table saved_searches
+    add column if not exists last_seen_date_scraped timestamptz;
+
+create index if not exists jobs_date_scraped_id_idx on jobs (date_scraped, id);
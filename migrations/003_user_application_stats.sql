@@ -0,0 +1,178 @@
+-- Per-user application statistics for GET /users/{user_id}/stats.
+--
+-- One row per user, kept current by triggers on job_applications and
+-- application_timeline: each trigger applies the delta of the row it sees, so
+-- reading a user's stats is a primary-key lookup instead of an aggregate over
+-- all of their applications. Timeline events count towards the user owning
+-- their application. The backfill at the end fills in existing data.
+
+create table if not exists user_application_stats (
+    user_id uuid primary key,
+    total_applications integer not null default 0,
+    status_counts jsonb not null default '{}'::jsonb,
+    scored_applications integer not null default 0,
+    ai_match_score_sum bigint not null default 0,
+    timeline_events integer not null default 0,
+    last_activity_at timestamptz,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists application_timeline_application_id_idx on application_timeline (application_id);
+
+-- Add deltas to one user's row, creating it on first use
+create or replace function bump_user_application_stats(
+    p_user_id uuid,
+    p_status text,
+    p_applications integer,
+    p_scored integer,
+    p_score_sum bigint,
+    p_events integer
+)
+returns void
+language plpgsql
+as $$
+begin
+    if p_user_id is null then
+        return;
+    end if;
+    insert into user_application_stats as s (
+        user_id, total_applications, status_counts, scored_applications, ai_match_score_sum, timeline_events,
+        last_activity_at, updated_at
+    )
+    values (
+        p_user_id, p_applications,
+        case when p_status is null or p_applications = 0 then '{}'::jsonb
+             else jsonb_build_object(p_status, p_applications) end,
+        p_scored, p_score_sum, p_events, now(), now()
+    )
+    on conflict (user_id) do update set
+        total_applications = s.total_applications + p_applications,
+        status_counts = case when p_status is null or p_applications = 0 then s.status_counts
+                             else s.status_counts || jsonb_build_object(
+                                 p_status, coalesce((s.status_counts ->> p_status)::integer, 0) + p_applications
+                             ) end,
+        scored_applications = s.scored_applications + p_scored,
+        ai_match_score_sum = s.ai_match_score_sum + p_score_sum,
+        timeline_events = s.timeline_events + p_events,
+        last_activity_at = now(),
+        updated_at = now();
+end;
+$$;
+
+-- Runs before delete so the application's timeline events can still be counted
+-- (a cascading delete removes them first otherwise), and after insert/update.
+create or replace function job_applications_update_user_stats()
+returns trigger
+language plpgsql
+as $$
+declare
+    moved_events integer := 0;
+begin
+    if tg_op = 'DELETE' or (tg_op = 'UPDATE' and new.user_id is distinct from old.user_id) then
+        select count(*) into moved_events from application_timeline where application_id = old.id;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform bump_user_application_stats(
+            old.user_id, old.status, -1,
+            case when old.ai_match_score is null then 0 else -1 end,
+            -coalesce(old.ai_match_score, 0),
+            -moved_events
+        );
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform bump_user_application_stats(
+            new.user_id, new.status, 1,
+            case when new.ai_match_score is null then 0 else 1 end,
+            coalesce(new.ai_match_score, 0),
+            moved_events
+        );
+        return new;
+    end if;
+    return old;
+end;
+$$;
+
+drop trigger if exists job_applications_user_stats_delete on job_applications;
+create trigger job_applications_user_stats_delete
+    before delete on job_applications
+    for each row execute function job_applications_update_user_stats();
+
+drop trigger if exists job_applications_user_stats_write on job_applications;
+create trigger job_applications_user_stats_write
+    after insert or update of user_id, status, ai_match_score on job_applications
+    for each row execute function job_applications_update_user_stats();
+
+-- Events whose application is already gone (deleted with it) were subtracted
+-- by the application's delete trigger and are skipped here.
+create or replace function application_timeline_update_user_stats()
+returns trigger
+language plpgsql
+as $$
+declare
+    owner uuid;
+begin
+    if tg_op = 'DELETE' or (tg_op = 'UPDATE' and new.application_id is distinct from old.application_id) then
+        select user_id into owner from job_applications where id = old.application_id;
+        perform bump_user_application_stats(owner, null, 0, 0, 0, -1);
+    end if;
+    if tg_op = 'INSERT' or (tg_op = 'UPDATE' and new.application_id is distinct from old.application_id) then
+        select user_id into owner from job_applications where id = new.application_id;
+        perform bump_user_application_stats(owner, null, 0, 0, 0, 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists application_timeline_user_stats on application_timeline;
+create trigger application_timeline_user_stats
+    after insert or update of application_id or delete on application_timeline
+    for each row execute function application_timeline_update_user_stats();
+
+-- Backfill, locking out writes so no trigger delta is applied twice or missed
+begin;
+lock table job_applications, application_timeline in share row exclusive mode;
+
+insert into user_application_stats as s (
+    user_id, total_applications, status_counts, scored_applications, ai_match_score_sum, timeline_events,
+    last_activity_at, updated_at
+)
+select
+    a.user_id,
+    a.total,
+    coalesce((
+        select jsonb_object_agg(status, n)
+        from (
+            select status, count(*) as n
+            from job_applications
+            where user_id = a.user_id and status is not null
+            group by status
+        ) per_status
+    ), '{}'::jsonb),
+    a.scored,
+    a.score_sum,
+    coalesce(e.events, 0),
+    greatest(a.last_change, e.last_event),
+    now()
+from (
+    select user_id, count(*) as total, count(ai_match_score) as scored,
+           coalesce(sum(ai_match_score), 0) as score_sum, max(coalesce(updated_at, created_at)) as last_change
+    from job_applications
+    where user_id is not null
+    group by user_id
+) a
+left join (
+    select ja.user_id, count(*) as events, max(t.created_at) as last_event
+    from application_timeline t
+    join job_applications ja on ja.id = t.application_id
+    group by ja.user_id
+) e on e.user_id = a.user_id
+on conflict (user_id) do update set
+    total_applications = excluded.total_applications,
+    status_counts = excluded.status_counts,
+    scored_applications = excluded.scored_applications,
+    ai_match_score_sum = excluded.ai_match_score_sum,
+    timeline_events = excluded.timeline_events,
+    last_activity_at = excluded.last_activity_at,
+    updated_at = now();
+
+commit;
@@ -0,0 +1,22 @@
+-- Unique ingest key for POST /jobs/ingest.
+--
+-- Ingest upserts new jobs on (user_id, job_url), so two concurrent ingests of
+-- the same feed update one row instead of inserting it twice. NULLs stay
+-- distinct in that index, so any number of jobs without a job_url can be
+-- created through POST /jobs/. Jobs without a user_id are covered by a second,
+-- partial index on job_url alone.
+--
+-- Creating the indexes fails if duplicates are already stored; list them with
+--
+--     select user_id, job_url, count(*) from jobs
+--     where job_url is not null
+--     group by user_id, job_url having count(*) > 1;
+--
+-- (rows without a user_id group together, as the partial index treats them)
+-- and merge or delete them first.
+
+drop index if exists jobs_user_id_job_url_key;
+create unique index jobs_user_id_job_url_key on jobs (user_id, job_url);
+
+create unique index if not exists jobs_job_url_without_user_key
+    on jobs (job_url) where user_id is null;
@@ -0,0 +1,40 @@
+-- Keep updated_at current on job_applications and application_timeline.
+--
+-- Every insert and update stamps updated_at, whoever writes the row, and no
+-- row is left without one. (The collection ETags that first relied on it use
+-- the version counters from 008_collection_versions.sql instead.)
+
+alter table application_timeline
+    add column if not exists updated_at timestamptz;
+
+update job_applications set updated_at = coalesce(created_at, now()) where updated_at is null;
+update application_timeline set updated_at = coalesce(created_at, now()) where updated_at is null;
+
+alter table job_applications alter column updated_at set default now();
+alter table application_timeline alter column updated_at set default now();
+
+create or replace function set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists job_applications_set_updated_at on job_applications;
+create trigger job_applications_set_updated_at
+    before insert or update on job_applications
+    for each row execute function set_updated_at();
+
+drop trigger if exists application_timeline_set_updated_at on application_timeline;
+create trigger application_timeline_set_updated_at
+    before insert or update on application_timeline
+    for each row execute function set_updated_at();
+
+-- Serve the validator query (count plus latest updated_at per parent)
+create index if not exists job_applications_user_id_updated_at_idx
+    on job_applications (user_id, updated_at desc);
+create index if not exists application_timeline_application_id_updated_at_idx
+    on application_timeline (application_id, updated_at desc);
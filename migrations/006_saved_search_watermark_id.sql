@@ -0,0 +1,9 @@
+-- Make the incremental saved search watermark a (date_scraped, id) position.
+--
+-- A timestamp alone cannot tell apart jobs one scrape stamped with the same
+-- date_scraped, so a batch ending among them skipped the rest. The id of the
+-- last job returned breaks the tie; jobs_date_scraped_id_idx (002) serves the
+-- `(date_scraped, id) > (watermark, last id)` scan.
+
+alter table saved_searches
+    add column if not exists last_seen_job_id uuid;
@@ -0,0 +1,28 @@
+-- status_changed timeline events for job applications.
+--
+-- Written by a trigger in the same transaction as the status update, so the
+-- event's "from" status is the row's actual previous status however many
+-- writers race, and updates made outside the API are recorded too.
+
+create or replace function job_applications_record_status_change()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into application_timeline (application_id, event_type, event_description, event_data)
+    values (
+        new.id,
+        'status_changed',
+        format('Status changed from %s to %s', coalesce(old.status, 'none'), coalesce(new.status, 'none')),
+        jsonb_build_object('from', old.status, 'to', new.status)
+    );
+    return null;
+end;
+$$;
+
+drop trigger if exists job_applications_status_changed on job_applications;
+create trigger job_applications_status_changed
+    after update of status on job_applications
+    for each row
+    when (old.status is distinct from new.status)
+    execute function job_applications_record_status_change();
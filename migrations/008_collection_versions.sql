@@ -0,0 +1,57 @@
+-- Per-parent version counters behind the collection ETags.
+--
+-- GET /job-applications/?user_id= and GET /application-timeline/?application_id=
+-- derive their ETag from the version of the list they read (etag.collection_etag).
+-- Every insert, update and delete bumps the version of the parent it touches;
+-- the bump locks the counter row until the writing transaction ends, so writers
+-- take turns and each commit leaves a version no reader has seen before. The
+-- latest updated_at used previously could miss a write: now() is the start of
+-- the transaction, so one that started earlier but committed later did not
+-- move the maximum and polls kept getting 304s.
+
+create table if not exists collection_versions (
+    collection text not null,
+    parent text not null,
+    version bigint not null default 1,
+    primary key (collection, parent)
+);
+
+-- Bump the versions of the parents named by tg_argv[0] in the old and new row
+create or replace function bump_collection_version()
+returns trigger
+language plpgsql
+as $$
+declare
+    parent_value text;
+begin
+    for parent_value in
+        select distinct p from unnest(array[
+            case when tg_op <> 'DELETE' then to_jsonb(new) ->> tg_argv[0] end,
+            case when tg_op <> 'INSERT' then to_jsonb(old) ->> tg_argv[0] end
+        ]) as p
+        where p is not null
+        order by p
+    loop
+        insert into collection_versions as v (collection, parent) values (tg_table_name, parent_value)
+        on conflict (collection, parent) do update set version = v.version + 1;
+    end loop;
+    return null;
+end;
+$$;
+
+drop trigger if exists job_applications_bump_collection_version on job_applications;
+create trigger job_applications_bump_collection_version
+    after insert or update or delete on job_applications
+    for each row execute function bump_collection_version('user_id');
+
+drop trigger if exists application_timeline_bump_collection_version on application_timeline;
+create trigger application_timeline_bump_collection_version
+    after insert or update or delete on application_timeline
+    for each row execute function bump_collection_version('application_id');
+
+insert into collection_versions (collection, parent)
+select distinct 'job_applications', user_id::text from job_applications where user_id is not null
+on conflict do nothing;
+insert into collection_versions (collection, parent)
+select distinct 'application_timeline', application_id::text from application_timeline where application_id is not null
+on conflict do nothing;
@@ -85,6 +85,10 @@ class JobUpdate(JobBase):
     pass
 
 
+class JobBulkUpdate(JobUpdate):
+    id: str
+
+
 class Job(JobBase):
     id: str
     created_at: Optional[datetime] = None
@@ -94,6 +98,19 @@ class Job(JobBase):
         from_attributes = True
 
 
+class JobFilters(BaseModel):
+    user_id: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    job_type: Optional[str] = None
+    is_remote: Optional[bool] = None
+    status: Optional[str] = None
+
+
+class JobSearchResult(Job):
+    rank: float
+
+
 # Job Application Models
 class JobApplicationBase(BaseModel):
     user_id: Optional[str] = None
@@ -141,9 +158,14 @@ class ApplicationTimelineUpdate(ApplicationTimelineBase):
     pass
 
 
+class ApplicationTimelineBulkUpdate(ApplicationTimelineUpdate):
+    id: str
+
+
 class ApplicationTimeline(ApplicationTimelineBase):
     id: str
     created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -196,8 +218,75 @@ class SavedSearchUpdate(SavedSearchBase):
 
 class SavedSearch(SavedSearchBase):
     id: str
+    last_seen_date_scraped: Optional[datetime] = None
+    last_seen_job_id: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+# Bulk Operation Models
+class BulkDeleteRequest(BaseModel):
+    ids: List[str]
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status: str
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class JobIngestResult(BulkResult):
+    created: int
+    updated: int
+    unchanged: int
+
+
+# Dashboard Models
+class DashboardApplication(JobApplication):
+    job: Optional[Job] = None
+    timeline: List[ApplicationTimeline] = []
+
+
+class UserDashboard(BaseModel):
+    profile: Profile
+    settings: Optional[UserSettings] = None
+    cvs: List[CV] = []
+    applications: List[DashboardApplication] = []
+
+
+class UserApplicationStats(BaseModel):
+    user_id: str
+    total_applications: int = 0
+    applications_by_status: Dict[str, int] = {}
+    scored_applications: int = 0
+    average_ai_match_score: Optional[float] = None
+    timeline_events: int = 0
+    last_activity_at: Optional[datetime] = None
+
+
+class SavedSearchNewResults(BaseModel):
+    jobs: List[Job]
+    last_seen_date_scraped: Optional[datetime] = None
+    last_seen_job_id: Optional[str] = None
+    has_more: bool
+
+
+# Match Scoring Models
+class MatchScore(BaseModel):
+    id: str
+    score: float
+
+
+class MatchScoreResult(BaseModel):
+    matches: List[MatchScore]
+    applications_updated: int = 0
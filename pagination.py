@@ -0,0 +1,111 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response
+
+from singleflight import execute_read
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(row: Dict[str, Any], key: str = "id") -> str:
+    """Encode the (created_at, key) position of a row as an opaque cursor"""
+    payload = json.dumps([row.get("created_at"), row.get(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[str], str]:
+    """Decode a cursor produced by encode_cursor.
+
+    Both values end up in a PostgREST filter, so they are parsed and re-rendered
+    rather than passed through: created_at must be an ISO timestamp (or null)
+    and the key a UUID.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if created_at is not None:
+            created_at = datetime.fromisoformat(created_at).isoformat()
+        key = str(uuid.UUID(key))
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, key
+
+
+class PageParams:
+    """Query parameters shared by all paginated list endpoints"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None, description="Opaque cursor returned in the X-Next-Cursor header"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.position = decode_cursor(cursor) if cursor else None
+
+
+def paginate(query, page: PageParams, key: str = "id"):
+    """Apply keyset pagination on (created_at, key), newest first.
+
+    Rows after the cursor are selected with a range predicate instead of an
+    OFFSET, so every page costs the same index scan however deep it is. One
+    extra row is requested to detect whether another page exists. Rows without
+    a created_at sort first, as PostgreSQL does for descending order.
+    """
+    if page.position:
+        created_at, last_key = page.position
+        if created_at is None:
+            query = query.or_(f'created_at.not.is.null,and(created_at.is.null,{key}.lt."{last_key}")')
+        else:
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",{key}.lt."{last_key}")'
+            )
+    query = query.order("created_at", desc=True, nullsfirst=True).order(key, desc=True)
+    return query.limit(page.limit + 1)
+
+
+async def fetch_page(query, page: PageParams, key: str = "id") -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Execute a paginated query and return the rows with the next cursor.
+
+    Identical page requests already in flight share one query.
+    """
+    response = await execute_read(paginate(query, page, key))
+    rows = response.data
+    if len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    return rows, encode_cursor(rows[-1], key)
+
+
+async def iter_pages(
+    build_query: Callable[[], Any],
+    page_size: int = MAX_PAGE_SIZE,
+    key: str = "id",
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Walk a whole result set page by page.
+
+    `build_query` must return a fresh query on every call, since query builders
+    accumulate parameters. Only one page is held in memory at a time.
+    """
+    cursor = None
+    while True:
+        rows, cursor = await fetch_page(build_query(), PageParams(limit=page_size, cursor=cursor), key)
+        if rows:
+            yield rows
+        if not cursor:
+            return
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the next cursor to the client, if there is a next page"""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,155 @@
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import get_settings
+from metrics import request_db_seconds
+
+# Request header that asks for a profile; its value must be the admin token
+PROFILE_HEADER = "x-profile"
+
+# Functions listed per profile, by cumulative time
+TOP_FUNCTIONS = 30
+
+# Where profiled time is attributed, by the file or builtin name of each function.
+# The first matching category wins; anything else is "app".
+CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("serialization", (
+        "SchemaSerializer", "fastapi/encoders.py", "starlette/responses.py", "/json/", "json.encoder", "_json.",
+    )),
+    ("validation", ("pydantic",)),
+    ("database", ("/httpx/", "/httpcore/", "/h11/", "/h2/", "/postgrest/", "/supabase/", "/gotrue/", "ssl")),
+    ("event_loop", ("asyncio", "selectors", "uvloop")),
+]
+
+FunctionKey = Tuple[str, int, str]
+
+
+def _category(function: FunctionKey) -> str:
+    filename, _, name = function
+    where = f"{filename}:{name}".replace("\\", "/")
+    for category, markers in CATEGORIES:
+        if any(marker in where for marker in markers):
+            return category
+    return "app"
+
+
+def summarize_stats(stats: pstats.Stats) -> Dict[str, Any]:
+    """Own (exclusive) time per category and the top functions by cumulative time"""
+    breakdown: Dict[str, float] = {category: 0.0 for category, _ in CATEGORIES}
+    breakdown["app"] = 0.0
+    for function, (_, _, own, _, _) in stats.stats.items():
+        breakdown[_category(function)] += own
+    top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+    return {
+        "cpu_seconds": breakdown,
+        "top_functions": [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "own_seconds": own,
+                "cumulative_seconds": cumulative,
+            }
+            for (filename, line, name), (_, calls, own, cumulative, _) in top
+        ],
+    }
+
+
+class ProfileStore:
+    """Ring buffer of the most recent request profiles"""
+
+    def __init__(self, max_profiles: int):
+        self.profiles: Deque[Dict[str, Any]] = deque(maxlen=max_profiles)
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        self.profiles.append(profile)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {key: value for key, value in profile.items() if key not in ("top_functions", "pstats")}
+            for profile in reversed(self.profiles)
+        ]
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return next((profile for profile in self.profiles if profile["id"] == profile_id), None)
+
+
+@lru_cache(maxsize=None)
+def get_profile_store() -> ProfileStore:
+    """The worker's recent profiles, sized from the settings on first use"""
+    return ProfileStore(get_settings().PROFILING_MAX_PROFILES)
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry the profile header or are sampled.
+
+    cProfile sees everything running on the event loop thread, so overlapping
+    requests show up in a profile too; only one request is profiled at a time.
+    Database time is the wall time spent waiting on PostgREST round-trips, as
+    recorded by the metrics hooks; the rest of the breakdown is profiled own time
+    per category. `sample_rate` and `token` default to PROFILING_SAMPLE_RATE
+    and ADMIN_TOKEN; with neither set every request passes straight through.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None, token: Optional[str] = None):
+        settings = get_settings()
+        self.app = app
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.token = settings.ADMIN_TOKEN if token is None else token
+        self._active = False
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.token and Headers(scope=scope).get(PROFILE_HEADER) == self.token:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._active or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        db_before = request_db_seconds()
+        started_at = datetime.now(timezone.utc).isoformat()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - started
+            self._active = False
+            stats = pstats.Stats(profiler, stream=io.StringIO())
+            route = scope.get("route")
+            get_profile_store().add({
+                "id": uuid.uuid4().hex,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status_code,
+                "started_at": started_at,
+                "wall_seconds": wall,
+                "db_wait_seconds": request_db_seconds() - db_before,
+                **summarize_stats(stats),
+                "pstats": marshal.dumps(stats.stats),
+            })
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Response
+from typing import Any, Dict, List, Optional
+from config import get_settings
+from profiling import get_profile_store
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured admin token"""
+    token = get_settings().ADMIN_TOKEN
+    if not token:
+        raise HTTPException(status_code=404, detail="Not found")
+    if x_admin_token != token:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles() -> List[Dict[str, Any]]:
+    """Summaries of the most recent request profiles, newest first"""
+    return get_profile_store().list()
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str) -> Dict[str, Any]:
+    """Time breakdown and top functions of one request profile"""
+    profile = get_profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return {key: value for key, value in profile.items() if key != "pstats"}
+
+
+@router.get("/profiles/{profile_id}/pstats", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """Raw cProfile data, loadable with pstats, snakeviz or flameprof"""
+    profile = get_profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        profile["pstats"],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+    )
@@ -1,39 +1,116 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
 from typing import List, Optional
-from models import ApplicationTimeline, ApplicationTimelineCreate, ApplicationTimelineUpdate
+from models import (
+    ApplicationTimeline,
+    ApplicationTimelineBulkUpdate,
+    ApplicationTimelineCreate,
+    ApplicationTimelineUpdate,
+    BulkDeleteRequest,
+    BulkResult,
+)
+from bulk import bulk_delete, bulk_insert, bulk_update, check_batch_size
+from cache import get_row, get_read_cache
 from database import get_supabase
+from etag import collection_etag, not_modified
+from fields import FieldSelection
+from pagination import PageParams, fetch_page, iter_pages, set_next_cursor
+from responses import rows_response
+from streaming import EXPORT_PAGE_SIZE, ndjson_response
 
 router = APIRouter(prefix="/application-timeline", tags=["application-timeline"])
 
+select_fields = FieldSelection(ApplicationTimeline)
 
-@router.get("/", response_model=List[ApplicationTimeline])
+
+def _filter_timeline_events(
+    query,
+    application_id: Optional[str] = None,
+    event_type: Optional[str] = None,
+):
+    """Apply the optional timeline event list filters to a query"""
+    if application_id:
+        query = query.eq("application_id", application_id)
+    if event_type:
+        query = query.eq("event_type", event_type)
+    return query
+
+
+@router.get("/", response_model=List[ApplicationTimeline], response_model_exclude_unset=True)
 async def get_application_timeline_events(
+    request: Request,
+    response: Response,
     application_id: Optional[str] = Query(None),
     event_type: Optional[str] = Query(None),
+    page: PageParams = Depends(),
+    columns: str = Depends(select_fields),
 ):
-    """Get all application timeline events with optional filters"""
+    """Get a page of application timeline events, newest first, with optional filters"""
     try:
-        query = get_supabase().table("application_timeline").select("*")
-
         if application_id:
-            query = query.eq("application_id", application_id)
-        if event_type:
-            query = query.eq("event_type", event_type)
-
-        response = query.order("created_at", desc=True).execute()
-        return response.data
+            etag = await collection_etag(request, "application_timeline", application_id)
+            cached = not_modified(request, etag)
+            if cached is not None:
+                return cached
+            response.headers["ETag"] = etag
+        query = _filter_timeline_events(
+            get_supabase().table("application_timeline").select(columns), application_id, event_type
+        )
+        rows, next_cursor = await fetch_page(query, page)
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[ApplicationTimeline], rows, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{event_id}", response_model=ApplicationTimeline)
-async def get_application_timeline_event(event_id: str):
+@router.get("/export")
+async def export_application_timeline_events(
+    application_id: Optional[str] = Query(None),
+    event_type: Optional[str] = Query(None),
+    columns: str = Depends(select_fields),
+):
+    """Stream every matching timeline event as newline-delimited JSON"""
+
+    def build_query():
+        return _filter_timeline_events(
+            get_supabase().table("application_timeline").select(columns), application_id, event_type
+        )
+
+    return ndjson_response(iter_pages(build_query, EXPORT_PAGE_SIZE), "application_timeline")
+
+
+@router.post("/bulk", response_model=BulkResult)
+async def create_application_timeline_events_bulk(events: List[ApplicationTimelineCreate]):
+    """Create many timeline events with chunked multi-row inserts"""
+    check_batch_size(events)
+    rows = [event.model_dump(mode="json", exclude_unset=True) for event in events]
+    return await bulk_insert("application_timeline", rows)
+
+
+@router.put("/bulk", response_model=BulkResult)
+async def update_application_timeline_events_bulk(events: List[ApplicationTimelineBulkUpdate]):
+    """Update many timeline events, each identified by its id"""
+    check_batch_size(events)
+    return await bulk_update(
+        "application_timeline",
+        [(event.id, event.model_dump(mode="json", exclude_unset=True, exclude={"id"})) for event in events],
+    )
+
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def delete_application_timeline_events_bulk(request: BulkDeleteRequest):
+    """Delete many timeline events by id"""
+    check_batch_size(request.ids)
+    return await bulk_delete("application_timeline", request.ids)
+
+
+@router.get("/{event_id}", response_model=ApplicationTimeline, response_model_exclude_unset=True)
+async def get_application_timeline_event(event_id: str, columns: str = Depends(select_fields)):
     """Get a specific timeline event by ID"""
     try:
-        response = get_supabase().table("application_timeline").select("*").eq("id", event_id).execute()
-        if not response.data:
+        row = await get_row("application_timeline", event_id, columns)
+        if row is None:
             raise HTTPException(status_code=404, detail="Timeline event not found")
-        return response.data[0]
+        return rows_response(ApplicationTimeline, row)
     except HTTPException:
         raise
     except Exception as e:
@@ -44,7 +121,7 @@ async def get_application_timeline_event(event_id: str):
 async def create_application_timeline_event(event: ApplicationTimelineCreate):
     """Create a new timeline event"""
     try:
-        response = get_supabase().table("application_timeline").insert(
+        response = await get_supabase().table("application_timeline").insert(
             event.model_dump(exclude_unset=True)
         ).execute()
         return response.data[0]
@@ -56,9 +133,10 @@ async def create_application_timeline_event(event: ApplicationTimelineCreate):
 async def update_application_timeline_event(event_id: str, event: ApplicationTimelineUpdate):
     """Update a timeline event"""
     try:
-        response = get_supabase().table("application_timeline").update(
+        response = await get_supabase().table("application_timeline").update(
             event.model_dump(exclude_unset=True)
         ).eq("id", event_id).execute()
+        await get_read_cache().invalidate("application_timeline", event_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Timeline event not found")
         return response.data[0]
@@ -72,7 +150,8 @@ async def update_application_timeline_event(event_id: str, event: ApplicationTim
 async def delete_application_timeline_event(event_id: str):
     """Delete a timeline event"""
     try:
-        response = get_supabase().table("application_timeline").delete().eq("id", event_id).execute()
+        response = await get_supabase().table("application_timeline").delete().eq("id", event_id).execute()
+        await get_read_cache().invalidate("application_timeline", event_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Timeline event not found")
     except HTTPException:
@@ -1,32 +1,45 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Response
 from typing import List, Optional
-from models import CV, CVCreate, CVUpdate
+from models import CV, CVCreate, CVUpdate, MatchScoreResult
+from cache import get_row, get_read_cache
 from database import get_supabase
+from fields import FieldSelection
+from pagination import PageParams, fetch_page, set_next_cursor
+from responses import rows_response
+from scoring import cv_text, get_job_index, write_match_scores
 
 router = APIRouter(prefix="/cvs", tags=["cvs"])
 
+select_fields = FieldSelection(CV)
 
-@router.get("/", response_model=List[CV])
-async def get_cvs(user_id: Optional[str] = Query(None)):
-    """Get all CVs, optionally filtered by user_id"""
+
+@router.get("/", response_model=List[CV], response_model_exclude_unset=True)
+async def get_cvs(
+    response: Response,
+    user_id: Optional[str] = Query(None),
+    page: PageParams = Depends(),
+    columns: str = Depends(select_fields),
+):
+    """Get a page of CVs, optionally filtered by user_id"""
     try:
-        query = get_supabase().table("cvs").select("*")
+        query = get_supabase().table("cvs").select(columns)
         if user_id:
             query = query.eq("user_id", user_id)
-        response = query.execute()
-        return response.data
+        rows, next_cursor = await fetch_page(query, page)
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[CV], rows, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{cv_id}", response_model=CV)
-async def get_cv(cv_id: str):
+@router.get("/{cv_id}", response_model=CV, response_model_exclude_unset=True)
+async def get_cv(cv_id: str, columns: str = Depends(select_fields)):
     """Get a specific CV by ID"""
     try:
-        response = get_supabase().table("cvs").select("*").eq("id", cv_id).execute()
-        if not response.data:
+        row = await get_row("cvs", cv_id, columns)
+        if row is None:
             raise HTTPException(status_code=404, detail="CV not found")
-        return response.data[0]
+        return rows_response(CV, row)
     except HTTPException:
         raise
     except Exception as e:
@@ -37,7 +50,7 @@ async def get_cv(cv_id: str):
 async def create_cv(cv: CVCreate):
     """Create a new CV"""
     try:
-        response = get_supabase().table("cvs").insert(cv.model_dump(exclude_unset=True)).execute()
+        response = await get_supabase().table("cvs").insert(cv.model_dump(exclude_unset=True)).execute()
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -47,9 +60,10 @@ async def create_cv(cv: CVCreate):
 async def update_cv(cv_id: str, cv: CVUpdate):
     """Update a CV"""
     try:
-        response = get_supabase().table("cvs").update(
+        response = await get_supabase().table("cvs").update(
             cv.model_dump(exclude_unset=True)
         ).eq("id", cv_id).execute()
+        await get_read_cache().invalidate("cvs", cv_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="CV not found")
         return response.data[0]
@@ -63,10 +77,38 @@ async def update_cv(cv_id: str, cv: CVUpdate):
 async def delete_cv(cv_id: str):
     """Delete a CV"""
     try:
-        response = get_supabase().table("cvs").delete().eq("id", cv_id).execute()
+        response = await get_supabase().table("cvs").delete().eq("id", cv_id).execute()
+        await get_read_cache().invalidate("cvs", cv_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="CV not found")
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{cv_id}/match-scores", response_model=MatchScoreResult)
+async def score_cv_against_jobs(
+    cv_id: str,
+    user_id: Optional[str] = Query(None, description="Owner of the jobs to rank; defaults to the CV's owner"),
+    top_k: int = Query(20, ge=1, le=1000),
+    write_back: bool = Query(True, description="Store the scores on this CV's applications as ai_match_score"),
+):
+    """Rank jobs against a CV by TF-IDF similarity"""
+    try:
+        cv = await get_row("cvs", cv_id)
+        if cv is None:
+            raise HTTPException(status_code=404, detail="CV not found")
+        index = await get_job_index()
+        scores = index.score(cv_text(cv), top_k, user_id or cv.get("user_id"))
+        updated = 0
+        if write_back and scores:
+            updated = await write_match_scores({(cv_id, job_id): score for job_id, score in scores})
+        return {
+            "matches": [{"id": job_id, "score": score} for job_id, score in scores],
+            "applications_updated": updated,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
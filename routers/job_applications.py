@@ -1,42 +1,90 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
 from typing import List, Optional
 from models import JobApplication, JobApplicationCreate, JobApplicationUpdate
+from cache import get_row, get_read_cache
 from database import get_supabase
+from etag import collection_etag, not_modified
+from fields import FieldSelection
+from pagination import PageParams, fetch_page, iter_pages, set_next_cursor
+from responses import rows_response
+from scoring import score_application
+from streaming import EXPORT_PAGE_SIZE, ndjson_response
+from tasks import get_task_queue
 
 router = APIRouter(prefix="/job-applications", tags=["job-applications"])
 
+select_fields = FieldSelection(JobApplication)
 
-@router.get("/", response_model=List[JobApplication])
+
+def _filter_job_applications(
+    query,
+    user_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """Apply the optional job application list filters to a query"""
+    if user_id:
+        query = query.eq("user_id", user_id)
+    if job_id:
+        query = query.eq("job_id", job_id)
+    if status:
+        query = query.eq("status", status)
+    return query
+
+
+@router.get("/", response_model=List[JobApplication], response_model_exclude_unset=True)
 async def get_job_applications(
+    request: Request,
+    response: Response,
     user_id: Optional[str] = Query(None),
     job_id: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
+    page: PageParams = Depends(),
+    columns: str = Depends(select_fields),
 ):
-    """Get all job applications with optional filters"""
+    """Get a page of job applications with optional filters"""
     try:
-        query = get_supabase().table("job_applications").select("*")
-
         if user_id:
-            query = query.eq("user_id", user_id)
-        if job_id:
-            query = query.eq("job_id", job_id)
-        if status:
-            query = query.eq("status", status)
-
-        response = query.execute()
-        return response.data
+            etag = await collection_etag(request, "job_applications", user_id)
+            cached = not_modified(request, etag)
+            if cached is not None:
+                return cached
+            response.headers["ETag"] = etag
+        query = _filter_job_applications(
+            get_supabase().table("job_applications").select(columns), user_id, job_id, status
+        )
+        rows, next_cursor = await fetch_page(query, page)
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[JobApplication], rows, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{application_id}", response_model=JobApplication)
-async def get_job_application(application_id: str):
+@router.get("/export")
+async def export_job_applications(
+    user_id: Optional[str] = Query(None),
+    job_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    columns: str = Depends(select_fields),
+):
+    """Stream every matching job application as newline-delimited JSON"""
+
+    def build_query():
+        return _filter_job_applications(
+            get_supabase().table("job_applications").select(columns), user_id, job_id, status
+        )
+
+    return ndjson_response(iter_pages(build_query, EXPORT_PAGE_SIZE), "job_applications")
+
+
+@router.get("/{application_id}", response_model=JobApplication, response_model_exclude_unset=True)
+async def get_job_application(application_id: str, columns: str = Depends(select_fields)):
     """Get a specific job application by ID"""
     try:
-        response = get_supabase().table("job_applications").select("*").eq("id", application_id).execute()
-        if not response.data:
+        row = await get_row("job_applications", application_id, columns)
+        if row is None:
             raise HTTPException(status_code=404, detail="Job application not found")
-        return response.data[0]
+        return rows_response(JobApplication, row)
     except HTTPException:
         raise
     except Exception as e:
@@ -47,10 +95,13 @@ async def get_job_application(application_id: str):
 async def create_job_application(application: JobApplicationCreate):
     """Create a new job application"""
     try:
-        response = get_supabase().table("job_applications").insert(
+        response = await get_supabase().table("job_applications").insert(
             application.model_dump(exclude_unset=True)
         ).execute()
-        return response.data[0]
+        row = response.data[0]
+        if row.get("cv_id") and row.get("ai_match_score") is None:
+            await get_task_queue().submit("score_application", score_application, row)
+        return row
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -59,12 +110,16 @@ async def create_job_application(application: JobApplicationCreate):
 async def update_job_application(application_id: str, application: JobApplicationUpdate):
     """Update a job application"""
     try:
-        response = get_supabase().table("job_applications").update(
-            application.model_dump(exclude_unset=True)
-        ).eq("id", application_id).execute()
+        values = application.model_dump(exclude_unset=True)
+        response = await get_supabase().table("job_applications").update(values).eq("id", application_id).execute()
+        await get_read_cache().invalidate("job_applications", application_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Job application not found")
-        return response.data[0]
+        row = response.data[0]
+        # A status change also adds a status_changed timeline event (migrations/007_status_change_events.sql)
+        if ("cv_id" in values or "job_id" in values) and "ai_match_score" not in values:
+            await get_task_queue().submit("score_application", score_application, row)
+        return row
     except HTTPException:
         raise
     except Exception as e:
@@ -75,7 +130,8 @@ async def update_job_application(application_id: str, application: JobApplicatio
 async def delete_job_application(application_id: str):
     """Delete a job application"""
     try:
-        response = get_supabase().table("job_applications").delete().eq("id", application_id).execute()
+        response = await get_supabase().table("job_applications").delete().eq("id", application_id).execute()
+        await get_read_cache().invalidate("job_applications", application_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Job application not found")
     except HTTPException:
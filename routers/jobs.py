@@ -1,51 +1,182 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List, Optional
-from models import Job, JobCreate, JobUpdate
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Response
+from typing import Any, Dict, List, Optional, Sequence
+from models import (
+    BulkDeleteRequest,
+    BulkResult,
+    Job,
+    JobBulkUpdate,
+    JobCreate,
+    JobFilters,
+    JobIngestResult,
+    JobSearchResult,
+    JobUpdate,
+    MatchScoreResult,
+)
+from bulk import bulk_delete, bulk_insert, bulk_update, check_batch_size
+from cache import get_row, get_read_cache
 from database import get_supabase
+from fields import FieldSelection
+from ingest import ingest_jobs
+from job_filters import apply_job_filters
+from matcher import notify_new_jobs
+from pagination import PageParams, fetch_page, iter_pages, set_next_cursor
+from responses import rows_response
+from scoring import cv_text, get_job_index, index_jobs, reindex_jobs, unindex_jobs, write_match_scores
+from streaming import EXPORT_PAGE_SIZE, ndjson_response
+from tasks import get_task_queue
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
+select_fields = FieldSelection(Job)
 
-@router.get("/", response_model=List[Job])
+
+def _created_jobs(jobs: Sequence[JobCreate], result: BulkResult) -> List[Dict[str, Any]]:
+    """Rebuild the rows created by a bulk write from the request and the per-item results"""
+    return [
+        {**jobs[item.index].model_dump(mode="json", exclude_unset=True), "id": item.id}
+        for item in result.results
+        if item.status == "created"
+    ]
+
+
+@router.get("/", response_model=List[Job], response_model_exclude_unset=True)
 async def get_jobs(
+    response: Response,
+    filters: JobFilters = Depends(),
+    page: PageParams = Depends(),
+    columns: str = Depends(select_fields),
+):
+    """Get a page of jobs with optional filters"""
+    try:
+        query = apply_job_filters(get_supabase().table("jobs").select(columns), filters)
+        rows, next_cursor = await fetch_page(query, page)
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[Job], rows, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export")
+async def export_jobs(
+    filters: JobFilters = Depends(),
+    columns: str = Depends(select_fields),
+):
+    """Stream every matching job as newline-delimited JSON"""
+
+    def build_query():
+        return apply_job_filters(get_supabase().table("jobs").select(columns), filters)
+
+    return ndjson_response(iter_pages(build_query, EXPORT_PAGE_SIZE), "jobs")
+
+
+@router.get("/search", response_model=List[JobSearchResult])
+async def search_jobs(
+    q: str = Query(..., min_length=1, description="Keywords; supports quoted phrases, OR and -exclusions"),
     user_id: Optional[str] = Query(None),
-    company: Optional[str] = Query(None),
-    location: Optional[str] = Query(None),
-    job_type: Optional[str] = Query(None),
-    is_remote: Optional[bool] = Query(None),
-    status: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
 ):
-    """Get all jobs with optional filters"""
+    """Ranked full-text search over job title, company and description"""
     try:
-        query = get_supabase().table("jobs").select("*")
-
-        if user_id:
-            query = query.eq("user_id", user_id)
-        if company:
-            query = query.ilike("company", f"%{company}%")
-        if location:
-            query = query.ilike("location", f"%{location}%")
-        if job_type:
-            query = query.eq("job_type", job_type)
-        if is_remote is not None:
-            query = query.eq("is_remote", is_remote)
-        if status:
-            query = query.eq("status", status)
-
-        response = query.execute()
-        return response.data
+        response = await get_supabase().rpc("search_jobs", {
+            "search_query": q,
+            "filter_user_id": user_id,
+            "result_limit": limit,
+            "result_offset": offset,
+        }).execute()
+        rows = [{**row["job"], "rank": row["rank"]} for row in response.data]
+        return rows_response(List[JobSearchResult], rows, exclude_unset=False)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{job_id}", response_model=Job)
-async def get_job(job_id: str):
+@router.post("/bulk", response_model=BulkResult)
+async def create_jobs_bulk(jobs: List[JobCreate]):
+    """Create many jobs with chunked multi-row inserts"""
+    check_batch_size(jobs)
+    result = await bulk_insert("jobs", [job.model_dump(mode="json", exclude_unset=True) for job in jobs])
+    created = _created_jobs(jobs, result)
+    index_jobs(created)
+    await get_task_queue().submit("notify_new_jobs", notify_new_jobs, created)
+    return result
+
+
+@router.put("/bulk", response_model=BulkResult)
+async def update_jobs_bulk(jobs: List[JobBulkUpdate]):
+    """Update many jobs, each identified by its id"""
+    check_batch_size(jobs)
+    result = await bulk_update(
+        "jobs", [(job.id, job.model_dump(mode="json", exclude_unset=True, exclude={"id"})) for job in jobs]
+    )
+    updated = [item.id for item in result.results if item.status == "updated"]
+    await get_task_queue().submit("reindex_jobs", reindex_jobs, updated)
+    return result
+
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def delete_jobs_bulk(request: BulkDeleteRequest):
+    """Delete many jobs by id"""
+    check_batch_size(request.ids)
+    result = await bulk_delete("jobs", request.ids)
+    unindex_jobs(item.id for item in result.results if item.status == "deleted")
+    return result
+
+
+@router.post("/ingest", response_model=JobIngestResult)
+async def ingest_jobs_batch(jobs: List[JobCreate]):
+    """Idempotently upsert scraped jobs keyed on (user_id, job_url)"""
+    check_batch_size(jobs)
+    result = await ingest_jobs(jobs)
+    created = _created_jobs(jobs, result)
+    index_jobs(created)
+    updated = [item.id for item in result.results if item.status == "updated"]
+    await get_task_queue().submit("reindex_jobs", reindex_jobs, updated)
+    await get_task_queue().submit("notify_new_jobs", notify_new_jobs, created)
+    return result
+
+
+@router.get("/{job_id}", response_model=Job, response_model_exclude_unset=True)
+async def get_job(job_id: str, columns: str = Depends(select_fields)):
     """Get a specific job by ID"""
     try:
-        response = get_supabase().table("jobs").select("*").eq("id", job_id).execute()
-        if not response.data:
+        row = await get_row("jobs", job_id, columns)
+        if row is None:
             raise HTTPException(status_code=404, detail="Job not found")
-        return response.data[0]
+        return rows_response(Job, row)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{job_id}/match-scores", response_model=MatchScoreResult)
+async def score_job_against_cvs(
+    job_id: str,
+    user_id: Optional[str] = Query(None, description="Owner of the CVs to rank; defaults to the job's owner"),
+    top_k: int = Query(20, ge=1, le=1000),
+    write_back: bool = Query(True, description="Store the scores on this job's applications as ai_match_score"),
+):
+    """Rank CVs against a job by TF-IDF similarity"""
+    try:
+        job = await get_row("jobs", job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        owner = user_id or job.get("user_id")
+
+        def build_query():
+            query = get_supabase().table("cvs").select("id,created_at,skills,content")
+            return query.eq("user_id", owner) if owner else query
+
+        documents = [(cv["id"], cv_text(cv)) async for page in iter_pages(build_query) for cv in page]
+        index = await get_job_index()
+        scores = index.score_documents(job, documents, top_k)
+        updated = 0
+        if write_back and scores:
+            updated = await write_match_scores({(cv_id, job_id): score for cv_id, score in scores})
+        return {
+            "matches": [{"id": cv_id, "score": score} for cv_id, score in scores],
+            "applications_updated": updated,
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -56,7 +187,9 @@ async def get_job(job_id: str):
 async def create_job(job: JobCreate):
     """Create a new job"""
     try:
-        response = get_supabase().table("jobs").insert(job.model_dump(exclude_unset=True)).execute()
+        response = await get_supabase().table("jobs").insert(job.model_dump(exclude_unset=True)).execute()
+        index_jobs(response.data)
+        await get_task_queue().submit("notify_new_jobs", notify_new_jobs, response.data)
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -66,11 +199,13 @@ async def create_job(job: JobCreate):
 async def update_job(job_id: str, job: JobUpdate):
     """Update a job"""
     try:
-        response = get_supabase().table("jobs").update(
+        response = await get_supabase().table("jobs").update(
             job.model_dump(exclude_unset=True)
         ).eq("id", job_id).execute()
+        await get_read_cache().invalidate("jobs", job_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Job not found")
+        index_jobs(response.data)
         return response.data[0]
     except HTTPException:
         raise
@@ -82,7 +217,9 @@ async def update_job(job_id: str, job: JobUpdate):
 async def delete_job(job_id: str):
     """Delete a job"""
     try:
-        response = get_supabase().table("jobs").delete().eq("id", job_id).execute()
+        response = await get_supabase().table("jobs").delete().eq("id", job_id).execute()
+        await get_read_cache().invalidate("jobs", job_id)
+        unindex_jobs([job_id])
         if not response.data:
             raise HTTPException(status_code=404, detail="Job not found")
     except HTTPException:
@@ -1,29 +1,41 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from typing import List
 from models import Profile, ProfileCreate, ProfileUpdate
+from cache import get_row, get_read_cache
 from database import get_supabase
+from fields import FieldSelection
+from pagination import PageParams, fetch_page, set_next_cursor
+from responses import rows_response
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
 
+select_fields = FieldSelection(Profile)
 
-@router.get("/", response_model=List[Profile])
-async def get_profiles():
-    """Get all profiles"""
+
+@router.get("/", response_model=List[Profile], response_model_exclude_unset=True)
+async def get_profiles(
+    response: Response,
+    page: PageParams = Depends(),
+    columns: str = Depends(select_fields),
+):
+    """Get a page of profiles"""
     try:
-        response = get_supabase().table("profiles").select("*").execute()
-        return response.data
+        query = get_supabase().table("profiles").select(columns)
+        rows, next_cursor = await fetch_page(query, page)
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[Profile], rows, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{profile_id}", response_model=Profile)
-async def get_profile(profile_id: str):
+@router.get("/{profile_id}", response_model=Profile, response_model_exclude_unset=True)
+async def get_profile(profile_id: str, columns: str = Depends(select_fields)):
     """Get a specific profile by ID"""
     try:
-        response = get_supabase().table("profiles").select("*").eq("id", profile_id).execute()
-        if not response.data:
+        row = await get_row("profiles", profile_id, columns)
+        if row is None:
             raise HTTPException(status_code=404, detail="Profile not found")
-        return response.data[0]
+        return rows_response(Profile, row)
     except HTTPException:
         raise
     except Exception as e:
@@ -34,7 +46,7 @@ async def get_profile(profile_id: str):
 async def create_profile(profile: ProfileCreate):
     """Create a new profile"""
     try:
-        response = get_supabase().table("profiles").insert(profile.model_dump(exclude_unset=True)).execute()
+        response = await get_supabase().table("profiles").insert(profile.model_dump(exclude_unset=True)).execute()
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -44,9 +56,10 @@ async def create_profile(profile: ProfileCreate):
 async def update_profile(profile_id: str, profile: ProfileUpdate):
     """Update a profile"""
     try:
-        response = get_supabase().table("profiles").update(
+        response = await get_supabase().table("profiles").update(
             profile.model_dump(exclude_unset=True)
         ).eq("id", profile_id).execute()
+        await get_read_cache().invalidate("profiles", profile_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Profile not found")
         return response.data[0]
@@ -60,7 +73,8 @@ async def update_profile(profile_id: str, profile: ProfileUpdate):
 async def delete_profile(profile_id: str):
     """Delete a profile"""
     try:
-        response = get_supabase().table("profiles").delete().eq("id", profile_id).execute()
+        response = await get_supabase().table("profiles").delete().eq("id", profile_id).execute()
+        await get_read_cache().invalidate("profiles", profile_id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Profile not found")
     except HTTPException:
@@ -1,32 +1,138 @@
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List, Optional
-from models import SavedSearch, SavedSearchCreate, SavedSearchUpdate
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Response
+from typing import Any, Dict, List, Optional
+from models import Job, JobFilters, SavedSearch, SavedSearchCreate, SavedSearchNewResults, SavedSearchUpdate
+from cache import get_row, get_read_cache
 from database import get_supabase
+from fields import FieldSelection
+from matcher import invalidate_matcher
+from job_filters import apply_job_filters, compile_search_params
+from pagination import PageParams, fetch_page, set_next_cursor
+from responses import rows_response
 
 router = APIRouter(prefix="/saved-searches", tags=["saved-searches"])
 
+select_fields = FieldSelection(SavedSearch)
+select_job_fields = FieldSelection(Job)
 
-@router.get("/", response_model=List[SavedSearch])
-async def get_saved_searches(user_id: Optional[str] = Query(None)):
-    """Get all saved searches, optionally filtered by user_id"""
+# Largest batch returned by one incremental run
+MAX_NEW_RESULTS = 500
+
+
+def _compile(search: Dict[str, Any]) -> JobFilters:
     try:
-        query = get_supabase().table("saved_searches").select("*")
+        return compile_search_params(search.get("search_params"))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get("/", response_model=List[SavedSearch], response_model_exclude_unset=True)
+async def get_saved_searches(
+    response: Response,
+    user_id: Optional[str] = Query(None),
+    page: PageParams = Depends(),
+    columns: str = Depends(select_fields),
+):
+    """Get a page of saved searches, optionally filtered by user_id"""
+    try:
+        query = get_supabase().table("saved_searches").select(columns)
         if user_id:
             query = query.eq("user_id", user_id)
-        response = query.execute()
-        return response.data
+        rows, next_cursor = await fetch_page(query, page)
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[SavedSearch], rows, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{search_id}", response_model=SavedSearch)
-async def get_saved_search(search_id: str):
+@router.get("/{search_id}", response_model=SavedSearch, response_model_exclude_unset=True)
+async def get_saved_search(search_id: str, columns: str = Depends(select_fields)):
     """Get a specific saved search by ID"""
     try:
-        response = get_supabase().table("saved_searches").select("*").eq("id", search_id).execute()
+        row = await get_row("saved_searches", search_id, columns)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Saved search not found")
+        return rows_response(SavedSearch, row)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{search_id}/results", response_model=List[Job], response_model_exclude_unset=True)
+async def get_saved_search_results(
+    search_id: str,
+    response: Response,
+    page: PageParams = Depends(),
+    columns: str = Depends(select_job_fields),
+):
+    """Run a saved search and get a page of matching jobs"""
+    try:
+        search = await get_row("saved_searches", search_id)
+        if search is None:
+            raise HTTPException(status_code=404, detail="Saved search not found")
+        query = apply_job_filters(get_supabase().table("jobs").select(columns), _compile(search))
+        rows, next_cursor = await fetch_page(query, page)
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[Job], rows, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{search_id}/results/new", response_model=SavedSearchNewResults)
+async def get_new_saved_search_results(search_id: str, limit: int = Query(100, ge=1, le=MAX_NEW_RESULTS)):
+    """Get jobs scraped since the saved search last ran, and advance its watermark.
+
+    The watermark is the (date_scraped, id) of the last job handed out, and
+    only jobs after it are read, in that order, so a run costs the new rows
+    rather than a rescan and jobs sharing a date_scraped are never skipped.
+    Call repeatedly until has_more is false.
+    """
+    try:
+        # Read the watermark from the database, not the read cache
+        response = await get_supabase().table("saved_searches").select("*").eq("id", search_id).execute()
         if not response.data:
             raise HTTPException(status_code=404, detail="Saved search not found")
-        return response.data[0]
+        search = response.data[0]
+        watermark = search.get("last_seen_date_scraped")
+        last_id = search.get("last_seen_job_id")
+
+        query = apply_job_filters(get_supabase().table("jobs").select("*"), _compile(search))
+        if watermark and last_id:
+            query = query.or_(
+                f'date_scraped.gt."{watermark}",and(date_scraped.eq."{watermark}",id.gt.{last_id})'
+            )
+        elif watermark:
+            # Set before the job id was stored; every job at the watermark was handed out
+            query = query.gt("date_scraped", watermark)
+        else:
+            query = query.not_.is_("date_scraped", "null")
+        rows = (await query.order("date_scraped").order("id").limit(limit + 1).execute()).data
+        batch, has_more = rows[:limit], len(rows) > limit
+
+        if batch:
+            new_watermark, new_last_id = batch[-1]["date_scraped"], batch[-1]["id"]
+            update = get_supabase().table("saved_searches").update(
+                {"last_seen_date_scraped": new_watermark, "last_seen_job_id": new_last_id}
+            )
+            update = update.eq("id", search_id)
+            # Compare-and-set, so two concurrent runs cannot both hand out the same batch
+            for column, value in (("last_seen_date_scraped", watermark), ("last_seen_job_id", last_id)):
+                update = update.eq(column, value) if value else update.is_(column, "null")
+            updated = await update.execute()
+            await get_read_cache().invalidate("saved_searches", search_id)
+            if not updated.data:
+                raise HTTPException(status_code=409, detail="Saved search was run concurrently, retry")
+        else:
+            new_watermark, new_last_id = watermark, last_id
+
+        return {
+            "jobs": batch,
+            "last_seen_date_scraped": new_watermark,
+            "last_seen_job_id": new_last_id,
+            "has_more": has_more,
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -37,9 +143,10 @@ async def get_saved_search(search_id: str):
 async def create_saved_search(search: SavedSearchCreate):
     """Create a new saved search"""
     try:
-        response = get_supabase().table("saved_searches").insert(
+        response = await get_supabase().table("saved_searches").insert(
             search.model_dump(exclude_unset=True)
         ).execute()
+        invalidate_matcher()
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -49,9 +156,11 @@ async def create_saved_search(search: SavedSearchCreate):
 async def update_saved_search(search_id: str, search: SavedSearchUpdate):
     """Update a saved search"""
     try:
-        response = get_supabase().table("saved_searches").update(
+        response = await get_supabase().table("saved_searches").update(
             search.model_dump(exclude_unset=True)
         ).eq("id", search_id).execute()
+        await get_read_cache().invalidate("saved_searches", search_id)
+        invalidate_matcher()
         if not response.data:
             raise HTTPException(status_code=404, detail="Saved search not found")
         return response.data[0]
@@ -65,7 +174,9 @@ async def update_saved_search(search_id: str, search: SavedSearchUpdate):
 async def delete_saved_search(search_id: str):
     """Delete a saved search"""
     try:
-        response = get_supabase().table("saved_searches").delete().eq("id", search_id).execute()
+        response = await get_supabase().table("saved_searches").delete().eq("id", search_id).execute()
+        await get_read_cache().invalidate("saved_searches", search_id)
+        invalidate_matcher()
         if not response.data:
             raise HTTPException(status_code=404, detail="Saved search not found")
     except HTTPException:
@@ -1,29 +1,42 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from typing import List
 from models import UserSettings, UserSettingsCreate, UserSettingsUpdate
+from cache import get_row, get_read_cache
 from database import get_supabase
+from fields import FieldSelection
+from matcher import invalidate_matcher
+from pagination import PageParams, fetch_page, set_next_cursor
+from responses import rows_response
 
 router = APIRouter(prefix="/user-settings", tags=["user-settings"])
 
+select_fields = FieldSelection(UserSettings, required=("user_id", "created_at"))
 
-@router.get("/", response_model=List[UserSettings])
-async def get_all_user_settings():
-    """Get all user settings"""
+
+@router.get("/", response_model=List[UserSettings], response_model_exclude_unset=True)
+async def get_all_user_settings(
+    response: Response,
+    page: PageParams = Depends(),
+    columns: str = Depends(select_fields),
+):
+    """Get a page of user settings"""
     try:
-        response = get_supabase().table("user_settings").select("*").execute()
-        return response.data
+        query = get_supabase().table("user_settings").select(columns)
+        rows, next_cursor = await fetch_page(query, page, key="user_id")
+        set_next_cursor(response, next_cursor)
+        return rows_response(List[UserSettings], rows, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/{user_id}", response_model=UserSettings)
-async def get_user_settings(user_id: str):
+@router.get("/{user_id}", response_model=UserSettings, response_model_exclude_unset=True)
+async def get_user_settings(user_id: str, columns: str = Depends(select_fields)):
     """Get user settings by user ID"""
     try:
-        response = get_supabase().table("user_settings").select("*").eq("user_id", user_id).execute()
-        if not response.data:
+        row = await get_row("user_settings", user_id, columns, key_column="user_id")
+        if row is None:
             raise HTTPException(status_code=404, detail="User settings not found")
-        return response.data[0]
+        return rows_response(UserSettings, row)
     except HTTPException:
         raise
     except Exception as e:
@@ -34,9 +47,10 @@ async def get_user_settings(user_id: str):
 async def create_user_settings(settings: UserSettingsCreate):
     """Create user settings"""
     try:
-        response = get_supabase().table("user_settings").insert(
+        response = await get_supabase().table("user_settings").insert(
             settings.model_dump(exclude_unset=True)
         ).execute()
+        invalidate_matcher()
         return response.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -46,9 +60,11 @@ async def create_user_settings(settings: UserSettingsCreate):
 async def update_user_settings(user_id: str, settings: UserSettingsUpdate):
     """Update user settings"""
     try:
-        response = get_supabase().table("user_settings").update(
+        response = await get_supabase().table("user_settings").update(
             settings.model_dump(exclude_unset=True)
         ).eq("user_id", user_id).execute()
+        await get_read_cache().invalidate("user_settings", user_id)
+        invalidate_matcher()
         if not response.data:
             raise HTTPException(status_code=404, detail="User settings not found")
         return response.data[0]
@@ -62,7 +78,9 @@ async def update_user_settings(user_id: str, settings: UserSettingsUpdate):
 async def delete_user_settings(user_id: str):
     """Delete user settings"""
     try:
-        response = get_supabase().table("user_settings").delete().eq("user_id", user_id).execute()
+        response = await get_supabase().table("user_settings").delete().eq("user_id", user_id).execute()
+        await get_read_cache().invalidate("user_settings", user_id)
+        invalidate_matcher()
         if not response.data:
             raise HTTPException(status_code=404, detail="User settings not found")
     except HTTPException:
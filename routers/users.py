@@ -0,0 +1,96 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Sequence
+
+from fastapi import APIRouter, HTTPException
+from models import UserApplicationStats, UserDashboard
+from bulk import chunked
+from cache import get_row
+from database import get_supabase
+from pagination import iter_pages
+from user_stats import get_user_stats
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+# Most recent applications included in a dashboard
+DASHBOARD_MAX_APPLICATIONS = 200
+
+# Ids per `IN (...)` lookup, keeping the query string well under proxy limits
+LOOKUP_CHUNK_SIZE = 100
+
+
+async def _fetch_all(build_query: Callable[[], Any]) -> List[Dict[str, Any]]:
+    """Every row of a query, newest first, read page by page so PostgREST's max-rows cannot truncate it"""
+    return [row async for page in iter_pages(build_query) for row in page]
+
+
+async def _fetch_in(table: str, column: str, values: Sequence[str]) -> List[Dict[str, Any]]:
+    """Fetch rows whose column is in values, one paged query per chunk, concurrently"""
+    if not values:
+        return []
+    pages = await asyncio.gather(*(
+        _fetch_all(lambda chunk=chunk: get_supabase().table(table).select("*").in_(column, list(chunk)))
+        for _, chunk in chunked(list(values), LOOKUP_CHUNK_SIZE)
+    ))
+    return [row for page in pages for row in page]
+
+
+@router.get("/{user_id}/dashboard", response_model=UserDashboard)
+async def get_user_dashboard(user_id: str):
+    """Get a user's profile, settings, CVs and applications with their jobs and timelines.
+
+    Independent reads run concurrently, and jobs and timeline events for all
+    applications are fetched with batched IN lookups, so the number of database
+    round-trips does not grow with the number of applications. CVs and timeline
+    events are read page by page, so none are dropped at PostgREST's row limit.
+    """
+    try:
+        profile, settings, cvs, applications = await asyncio.gather(
+            get_row("profiles", user_id),
+            get_row("user_settings", user_id, key_column="user_id"),
+            _fetch_all(lambda: get_supabase().table("cvs").select("*").eq("user_id", user_id)),
+            get_supabase().table("job_applications").select("*").eq("user_id", user_id)
+            .order("created_at", desc=True).limit(DASHBOARD_MAX_APPLICATIONS).execute(),
+        )
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+
+        applications = applications.data
+        job_ids = list({app["job_id"] for app in applications if app.get("job_id")})
+        jobs, events = await asyncio.gather(
+            _fetch_in("jobs", "id", job_ids),
+            _fetch_in("application_timeline", "application_id", [app["id"] for app in applications]),
+        )
+
+        jobs_by_id = {job["id"]: job for job in jobs}
+        timelines = defaultdict(list)
+        for event in sorted(events, key=lambda event: event.get("created_at") or "", reverse=True):
+            timelines[event["application_id"]].append(event)
+
+        return {
+            "profile": profile,
+            "settings": settings,
+            "cvs": cvs,
+            "applications": [
+                {**app, "job": jobs_by_id.get(app.get("job_id")), "timeline": timelines[app["id"]]}
+                for app in applications
+            ],
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{user_id}/stats", response_model=UserApplicationStats)
+async def get_user_application_stats(user_id: str):
+    """Get a user's application counts by status, average match score and timeline activity.
+
+    Served from aggregates that database triggers keep up to date on every
+    application and timeline write, so the cost does not grow with the number
+    of applications.
+    """
+    try:
+        return await get_user_stats(user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
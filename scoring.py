@@ -0,0 +1,353 @@
+import asyncio
+import logging
+import math
+import re
+import time
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bulk import bulk_update, chunked
+from cache import get_row, get_read_cache
+from database import get_supabase
+from pagination import iter_pages
+
+logger = logging.getLogger(__name__)
+
+# Hashed feature space; large enough that collisions between real terms are rare
+N_FEATURES = 1 << 18
+
+# Ids per `IN (...)` lookup when refreshing or writing back
+LOOKUP_CHUNK_SIZE = 100
+
+# Seconds before the job index is reloaded to pick up jobs written by other workers
+INDEX_TTL = 300.0
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the this to we will with you your"
+    .split()
+)
+
+# (feature indices, sublinear term frequencies), sorted by feature
+TermVector = Tuple[np.ndarray, np.ndarray]
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature(token: str) -> int:
+    return zlib.crc32(token.encode()) & (N_FEATURES - 1)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping terms like "c++", "c#" and "node.js" intact"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def term_vector(text: str) -> Optional[TermVector]:
+    """Hashed bag of words with 1 + log(tf) weights, or None for text without terms"""
+    counts = Counter(_feature(token) for token in tokenize(text))
+    if not counts:
+        return None
+    indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    order = np.argsort(indices)
+    return indices[order], (1.0 + np.log(tf[order])).astype(np.float32)
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    return " ".join(filter(None, [job.get("title"), job.get("description")]))
+
+
+def cv_text(cv: Dict[str, Any]) -> str:
+    return " ".join(filter(None, [" ".join(cv.get("skills") or []), cv.get("content")]))
+
+
+class _Matrix:
+    """Rows of L2-normalized TF-IDF weights in CSR layout"""
+
+    def __init__(
+        self,
+        ids: List[str],
+        vectors: Sequence[TermVector],
+        idf: np.ndarray,
+        owners: Optional[np.ndarray] = None,
+    ):
+        self.ids = ids
+        self.owners = owners
+        self.idf = idf
+        lengths = np.fromiter((len(indices) for indices, _ in vectors), dtype=np.int64, count=len(vectors))
+        self.indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        if vectors:
+            self.indices = np.concatenate([indices for indices, _ in vectors])
+            weights = np.concatenate([tf for _, tf in vectors]) * idf[self.indices]
+        else:
+            self.indices = np.zeros(0, dtype=np.int32)
+            weights = np.zeros(0, dtype=np.float32)
+        norms = np.sqrt(self._row_sums(weights * weights))
+        self.weights = weights / np.repeat(norms, lengths)
+
+    def _row_sums(self, values: np.ndarray) -> np.ndarray:
+        # Every row has at least one term, so no reduceat segment is empty
+        if not len(values):
+            return np.zeros(len(self.ids), dtype=np.float32)
+        return np.add.reduceat(values, self.indptr[:-1])
+
+    def dot(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row with a dense, normalized query vector"""
+        return self._row_sums(self.weights * query[self.indices])
+
+
+def _dense_query(vector: TermVector, idf: np.ndarray) -> np.ndarray:
+    indices, tf = vector
+    weights = tf * idf[indices]
+    query = np.zeros(N_FEATURES, dtype=np.float32)
+    query[indices] = weights / np.sqrt(np.dot(weights, weights))
+    return query
+
+
+def top_k(ids: Sequence[str], scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+    """The k best (id, score) pairs, best first, skipping zero scores"""
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(ids[i], float(scores[i])) for i in candidates if scores[i] > 0]
+
+
+class JobIndex:
+    """Term vectors of every job, with document frequencies kept up to date.
+
+    Job writes add, replace or drop single rows and adjust the document
+    frequencies in place. The IDF and the weighted matrix are re-derived from
+    the stored vectors, without touching the database, the next time they are
+    needed after a change.
+    """
+
+    def __init__(self):
+        self.vectors: Dict[str, TermVector] = {}
+        self.owners: Dict[str, Optional[str]] = {}
+        self.df = np.zeros(N_FEATURES, dtype=np.int32)
+        self._idf: Optional[np.ndarray] = None
+        self._matrix: Optional[_Matrix] = None
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _drop(self, job_id: str) -> None:
+        vector = self.vectors.pop(job_id, None)
+        self.owners.pop(job_id, None)
+        if vector is not None:
+            self.df[vector[0]] -= 1
+
+    def upsert(self, jobs: Iterable[Dict[str, Any]]) -> None:
+        for job in jobs:
+            self._drop(job["id"])
+            vector = term_vector(job_text(job))
+            if vector is not None:
+                self.vectors[job["id"]] = vector
+                self.owners[job["id"]] = job.get("user_id")
+                self.df[vector[0]] += 1
+        self._idf = self._matrix = None
+
+    def remove(self, job_ids: Iterable[str]) -> None:
+        for job_id in job_ids:
+            self._drop(job_id)
+        self._idf = self._matrix = None
+
+    def idf(self) -> np.ndarray:
+        """Smoothed inverse document frequency of every feature"""
+        if self._idf is None:
+            self._idf = (np.log((1.0 + len(self.vectors)) / (1.0 + self.df)) + 1.0).astype(np.float32)
+        return self._idf
+
+    def matrix(self) -> _Matrix:
+        if self._matrix is None:
+            ids = list(self.vectors)
+            owners = np.array([self.owners[job_id] for job_id in ids], dtype=object)
+            self._matrix = _Matrix(ids, [self.vectors[job_id] for job_id in ids], self.idf(), owners)
+        return self._matrix
+
+    def score(self, text: str, k: int, user_id: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Top-k jobs for a document, as one sparse matrix-vector product"""
+        vector = term_vector(text)
+        matrix = self.matrix()
+        if vector is None or not matrix.ids:
+            return []
+        scores = matrix.dot(_dense_query(vector, matrix.idf))
+        if user_id is not None:
+            scores[matrix.owners != user_id] = 0.0
+        return top_k(matrix.ids, scores, k)
+
+    def score_documents(
+        self, job: Dict[str, Any], documents: Sequence[Tuple[str, str]], k: int
+    ) -> List[Tuple[str, float]]:
+        """Top-k of (id, text) documents for a job, weighted with the job corpus IDF"""
+        vector = self.vectors.get(job["id"]) or term_vector(job_text(job))
+        vectors = [(doc_id, term_vector(text)) for doc_id, text in documents]
+        vectors = [(doc_id, vec) for doc_id, vec in vectors if vec is not None]
+        if vector is None or not vectors:
+            return []
+        idf = self.idf()
+        matrix = _Matrix([doc_id for doc_id, _ in vectors], [vec for _, vec in vectors], idf)
+        return top_k(matrix.ids, matrix.dot(_dense_query(vector, idf)), k)
+
+
+async def load_job_index() -> JobIndex:
+    """Build the index from every job's title and description.
+
+    Tokenizing the pages and building the matrix run on the default thread
+    pool, so other requests keep being served while the index loads.
+    """
+
+    def build_query():
+        return get_supabase().table("jobs").select("id,created_at,user_id,title,description")
+
+    index = JobIndex()
+    async for page in iter_pages(build_query):
+        await asyncio.to_thread(index.upsert, page)
+    await asyncio.to_thread(index.matrix)
+    return index
+
+
+_index: Optional[JobIndex] = None
+_loaded_at = 0.0
+_load_lock = asyncio.Lock()
+_reload: Optional["asyncio.Task[None]"] = None
+# Writes made while a reload runs, replayed on the new index before it is swapped in
+_pending: List[Tuple[str, List[Any]]] = []
+
+
+async def _reload_job_index() -> None:
+    global _index, _loaded_at, _reload
+    try:
+        index = await load_job_index()
+        for operation, items in _pending:
+            if operation == "upsert":
+                index.upsert(items)
+            else:
+                index.remove(items)
+        _index, _loaded_at = index, time.monotonic()
+    except Exception:
+        logger.exception("Reloading the job index failed; the current one stays in use")
+    finally:
+        _pending.clear()
+        _reload = None
+
+
+async def get_job_index() -> JobIndex:
+    """Return the job index, loading it on first use.
+
+    Writes through this worker update the index in place, but other workers'
+    writes only arrive by reloading, so an index older than INDEX_TTL is
+    reloaded in the background while the current one keeps serving.
+    """
+    global _index, _loaded_at, _reload
+    async with _load_lock:
+        if _index is None:
+            _index = await load_job_index()
+            _loaded_at = time.monotonic()
+    if _reload is None and time.monotonic() - _loaded_at > INDEX_TTL:
+        _reload = asyncio.ensure_future(_reload_job_index())
+    return _index
+
+
+def index_jobs(jobs: Iterable[Dict[str, Any]]) -> None:
+    """Add or replace written jobs in the index, if it has been loaded"""
+    if _index is not None:
+        jobs = list(jobs)
+        _index.upsert(jobs)
+        if _reload is not None:
+            _pending.append(("upsert", jobs))
+
+
+def unindex_jobs(job_ids: Iterable[str]) -> None:
+    """Drop deleted jobs from the index, if it has been loaded"""
+    if _index is not None:
+        job_ids = list(job_ids)
+        _index.remove(job_ids)
+        if _reload is not None:
+            _pending.append(("remove", job_ids))
+
+
+async def reindex_jobs(job_ids: Sequence[str]) -> None:
+    """Re-read partially updated jobs so the index sees their full text"""
+    if _index is None or not job_ids:
+        return
+    try:
+        for _, chunk in chunked(list(job_ids), LOOKUP_CHUNK_SIZE):
+            response = await (
+                get_supabase().table("jobs")
+                .select("id,user_id,title,description")
+                .in_("id", list(chunk))
+                .execute()
+            )
+            index_jobs(response.data)
+            unindex_jobs(set(chunk) - {row["id"] for row in response.data})
+    except Exception:
+        # A stale entry only skews scores until the next write; drop the index instead
+        logger.exception("Reindexing %d job(s) failed; the job index will be reloaded", len(job_ids))
+        reset_job_index()
+
+
+def reset_job_index() -> None:
+    global _index
+    _index = None
+
+
+def to_match_score(score: float) -> int:
+    """Cosine similarity as the 0-100 integer stored in ai_match_score"""
+    return int(math.floor(score * 100 + 0.5))
+
+
+async def write_match_scores(pairs: Dict[Tuple[str, str], float]) -> int:
+    """Store scores on the job applications for the given (cv_id, job_id) pairs.
+
+    Returns the number of applications updated.
+    """
+    cv_ids = sorted({cv_id for cv_id, _ in pairs})
+    job_ids = sorted({job_id for _, job_id in pairs})
+    updates = []
+    for _, cv_chunk in chunked(cv_ids, LOOKUP_CHUNK_SIZE):
+        for _, job_chunk in chunked(job_ids, LOOKUP_CHUNK_SIZE):
+            response = await (
+                get_supabase().table("job_applications")
+                .select("id,cv_id,job_id,ai_match_score")
+                .in_("cv_id", list(cv_chunk))
+                .in_("job_id", list(job_chunk))
+                .execute()
+            )
+            for application in response.data:
+                score = pairs.get((application["cv_id"], application["job_id"]))
+                if score is None:
+                    continue
+                score = to_match_score(score)
+                if application.get("ai_match_score") != score:
+                    updates.append((application["id"], {"ai_match_score": score}))
+    if not updates:
+        return 0
+    return (await bulk_update("job_applications", updates)).succeeded
+
+
+async def score_application(application: Dict[str, Any]) -> None:
+    """Compute and store ai_match_score for one application's CV and job"""
+    cv_id, job_id = application.get("cv_id"), application.get("job_id")
+    if not cv_id or not job_id:
+        return
+    cv, job = await asyncio.gather(get_row("cvs", cv_id), get_row("jobs", job_id))
+    if cv is None or job is None:
+        return
+    scores = (await get_job_index()).score_documents(job, [(cv_id, cv_text(cv))], 1)
+    score = to_match_score(scores[0][1]) if scores else 0
+    await (
+        get_supabase().table("job_applications")
+        .update({"ai_match_score": score})
+        .eq("id", application["id"])
+        .execute()
+    )
+    await get_read_cache().invalidate("job_applications", application["id"])
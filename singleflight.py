@@ -0,0 +1,96 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller starts the call as its own task; callers arriving while it
+    is in flight await the same task and get the same result or exception. The
+    shared task is shielded, so a disconnecting caller does not cancel the work
+    the others are waiting for. Results are shared objects: callers must not
+    mutate them.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.executed += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller has gone away
+            task.exception()
+
+    def forget(self, matches: Callable[[Hashable], bool]) -> None:
+        """Stop sharing in-flight calls whose key matches, e.g. after a write that makes them stale.
+
+        Callers already waiting keep their result; later callers start a new call.
+        """
+        for key in [key for key in self._calls if matches(key)]:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "executed": self.executed, "shared": self.shared}
+
+
+# In-flight PostgREST selects, keyed by (path, method, query string, headers)
+reads = SingleFlight()
+
+
+def _read_key(query) -> Tuple[Any, ...]:
+    return (query.path, query.http_method, str(query.params), tuple(sorted(dict(query.headers).items())))
+
+
+async def execute_read(query) -> Any:
+    """Execute a select query, sharing the round-trip with identical selects already in flight"""
+    if query.http_method not in ("GET", "HEAD"):
+        return await query.execute()
+    return await reads.do(_read_key(query), query.execute)
+
+
+# Source table -> tables maintained from it by database triggers
+_derived_tables: Dict[str, Set[str]] = {}
+
+
+def add_derived_table(table: str, sources: Iterable[str]) -> None:
+    """Treat writes to any of `sources` as writes to `table`, which triggers keep in step with them"""
+    for source in sources:
+        _derived_tables.setdefault(source, set()).add(table)
+
+
+def forget_reads(table: str) -> None:
+    """Let reads of `table` started before a write stop being shared with later callers"""
+    paths = {f"/{name}" for name in (table, *_derived_tables.get(table, ()))}
+    reads.forget(lambda key: key[0] in paths)
+
+
+async def _on_write_response(response: "httpx.Response") -> None:
+    if response.request.method not in ("GET", "HEAD"):
+        forget_reads(response.request.url.path.rsplit("/", 1)[-1])
+
+
+def track_writes(client: "httpx.AsyncClient") -> None:
+    """Forget in-flight reads of a table whenever a write to it completes through `client`.
+
+    A request that starts after a write has returned then never joins a read
+    that started before it, so clients still read their own writes.
+    """
+    if _on_write_response not in client.event_hooks["response"]:
+        client.event_hooks["response"].append(_on_write_response)
@@ -0,0 +1,25 @@
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows fetched per database round-trip while exporting. fetch_page asks for one
+# extra row to find the next page, so this must stay below PostgREST's max-rows
+# (1000 on Supabase): a capped response would look like the last page.
+EXPORT_PAGE_SIZE = 500
+
+
+def ndjson_response(pages: AsyncIterator[List[Dict[str, Any]]], filename: str) -> StreamingResponse:
+    """Stream pages of rows as newline-delimited JSON, one chunk per page"""
+
+    async def body():
+        async for rows in pages:
+            yield b"".join(to_json(row) + b"\n" for row in rows)
+
+    return StreamingResponse(
+        body(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'},
+    )
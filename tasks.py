@@ -0,0 +1,161 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Recent wait and run durations kept for the latency percentiles
+LATENCY_SAMPLES = 1000
+
+# Queued item: (task name, function, args, enqueued at)
+_Item = Tuple[str, Callable[..., Any], Tuple[Any, ...], float]
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class TaskQueue:
+    """In-process queue that runs request side effects on a pool of workers.
+
+    Routers submit work that does not have to finish before the response, such
+    as timeline events, match scores and notifications. Failed tasks are retried
+    with exponential backoff. When the queue is full, `submit` waits up to
+    `enqueue_timeout` for room and then runs the task inline, so a burst slows
+    writers down instead of dropping work or growing memory without bound. Tasks
+    also run inline while the workers are not started, e.g. outside the app.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        workers: int,
+        max_retries: int,
+        retry_delay: float,
+        enqueue_timeout: float,
+    ):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional["asyncio.Queue[_Item]"] = None
+        self._workers: List[asyncio.Task] = []
+        self.counters: Dict[str, int] = {
+            "submitted": 0, "inline": 0, "completed": 0, "retried": 0, "failed": 0,
+        }
+        self.by_task: Dict[str, Dict[str, int]] = {}
+        self.wait_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.run_times: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def start(self) -> None:
+        """Start the worker pool on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.maxsize)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let queued tasks finish for up to `timeout` seconds, then stop the workers"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping task queue with %d task(s) still queued", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue, self._workers = None, []
+
+    async def drain(self) -> None:
+        """Wait until every queued task has finished"""
+        if self.running:
+            await self._queue.join()
+
+    def _count(self, name: str, counter: str) -> None:
+        self.counters[counter] += 1
+        task_counters = self.by_task.setdefault(name, {"completed": 0, "retried": 0, "failed": 0})
+        if counter in task_counters:
+            task_counters[counter] += 1
+
+    async def submit(self, name: str, function: Callable[..., Any], *args: Any) -> None:
+        """Queue `function(*args)`; coroutine functions are awaited by the worker"""
+        self.counters["submitted"] += 1
+        if self.running:
+            item = (name, function, args, time.monotonic())
+            try:
+                await asyncio.wait_for(self._queue.put(item), self.enqueue_timeout)
+                return
+            except asyncio.TimeoutError:
+                logger.warning("Task queue full; running %s inline", name)
+        self.counters["inline"] += 1
+        await self._run(name, function, args)
+
+    async def _run(self, name: str, function: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        started = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = function(*args)
+                if inspect.isawaitable(result):
+                    await result
+                self._count(name, "completed")
+                break
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("Task %s failed after %d attempt(s)", name, attempt + 1)
+                    self._count(name, "failed")
+                    break
+                self._count(name, "retried")
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+        self.run_times.append(time.monotonic() - started)
+
+    async def _worker(self) -> None:
+        while True:
+            name, function, args, enqueued = await self._queue.get()
+            self.wait_times.append(time.monotonic() - enqueued)
+            try:
+                await self._run(name, function, args)
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        wait_times, run_times = list(self.wait_times), list(self.run_times)
+        return {
+            "running": self.running,
+            "depth": self._queue.qsize() if self.running else 0,
+            "max_depth": self.maxsize,
+            "workers": self.workers,
+            **self.counters,
+            "wait_seconds": {"p50": _percentile(wait_times, 0.5), "p95": _percentile(wait_times, 0.95)},
+            "run_seconds": {"p50": _percentile(run_times, 0.5), "p95": _percentile(run_times, 0.95)},
+            "tasks": self.by_task,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_task_queue() -> TaskQueue:
+    """The worker's task queue, configured from the settings on first use"""
+    settings = get_settings()
+    return TaskQueue(
+        settings.TASK_QUEUE_SIZE,
+        settings.TASK_WORKERS,
+        settings.TASK_MAX_RETRIES,
+        settings.TASK_RETRY_DELAY,
+        settings.TASK_ENQUEUE_TIMEOUT,
+    )
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+# Tests run against the in-process PostgREST stand-in; the settings only need to parse
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_KEY", "SUPABASE_JWT_SECRET"):
+    os.environ.setdefault(name, "http://localhost" if name == "SUPABASE_URL" else "unused.unused.unused")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache  # noqa: E402
+import database  # noqa: E402
+import dataloader  # noqa: E402
+from benchmarks.postgrest_stub import PostgrestStub  # noqa: E402
+
+
+@pytest.fixture
+def stub():
+    """A PostgREST stand-in behind the shared Supabase client, with fresh loaders and read cache"""
+    postgrest = PostgrestStub()
+    database.set_supabase(postgrest.client())
+    dataloader._loaders.clear()
+    cache.get_read_cache.cache_clear()
+    yield postgrest
+    database.set_supabase(None)
+    dataloader._loaders.clear()
+    cache.get_read_cache.cache_clear()
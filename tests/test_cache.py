@@ -0,0 +1,160 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+import cache
+from cache import MemoryBackend, ReadCache, SQLiteBackend, get_read_cache, get_row
+
+KEY = str(uuid.uuid4())
+ROW = {"id": KEY, "title": "Engineer"}
+
+
+def memory_cache(**kwargs):
+    return ReadCache(MemoryBackend(1 << 20), default_ttl=60.0, **kwargs)
+
+
+def test_set_get_invalidate():
+    read_cache = memory_cache()
+
+    async def scenario():
+        await read_cache.set("jobs", KEY, ROW)
+        cached = await read_cache.get("jobs", KEY)
+        await read_cache.invalidate("jobs", KEY)
+        return cached, await read_cache.get("jobs", KEY)
+
+    cached, after = asyncio.run(scenario())
+    assert cached == ROW
+    assert after is None
+    assert read_cache.stats()["tables"] == {"jobs": {"hits": 1, "misses": 1}}
+
+
+def test_invalidation_matches_keys_in_any_case():
+    read_cache = memory_cache()
+
+    async def scenario():
+        await read_cache.set("jobs", KEY, ROW)
+        await read_cache.invalidate_many("jobs", [KEY.upper()])
+        return await read_cache.get("jobs", KEY)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_a_row_invalidated_while_loading_is_not_stored():
+    read_cache = memory_cache()
+
+    async def scenario():
+        generation = read_cache.generation("jobs", KEY)
+        await read_cache.invalidate("jobs", KEY)
+        await read_cache.set("jobs", KEY, ROW, generation)
+        read_cache.release("jobs", KEY)
+        return await read_cache.get("jobs", KEY)
+
+    assert asyncio.run(scenario()) is None
+    assert read_cache._generations == {} and read_cache._loading == {}
+
+
+def test_a_row_loaded_without_invalidation_is_stored():
+    read_cache = memory_cache()
+
+    async def scenario():
+        generation = read_cache.generation("jobs", KEY)
+        await read_cache.invalidate("jobs", str(uuid.uuid4()))
+        await read_cache.set("jobs", KEY, ROW, generation)
+        read_cache.release("jobs", KEY)
+        return await read_cache.get("jobs", KEY)
+
+    assert asyncio.run(scenario()) == ROW
+
+
+def test_entries_expire_after_their_table_ttl():
+    read_cache = ReadCache(MemoryBackend(1 << 20), default_ttl=60.0, table_ttls={"jobs": 0.01})
+
+    async def scenario():
+        await read_cache.set("jobs", KEY, ROW)
+        await read_cache.set("cvs", KEY, ROW)
+        await asyncio.sleep(0.02)
+        return await read_cache.get("jobs", KEY), await read_cache.get("cvs", KEY)
+
+    assert asyncio.run(scenario()) == (None, ROW)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_bytes=50)
+
+    async def scenario():
+        await backend.set("a", {"v": "x" * 10}, 60.0)
+        await backend.set("b", {"v": "y" * 10}, 60.0)
+        await backend.get("a")
+        await backend.set("c", {"v": "z" * 10}, 60.0)
+        return [await backend.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+    assert backend.evictions == 1
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer, reader = SQLiteBackend(path, 1 << 20), SQLiteBackend(path, 1 << 20)
+
+    async def scenario():
+        await writer.set("jobs:1", ROW, 60.0)
+        cached = await reader.get("jobs:1")
+        await reader.delete(["jobs:1"])
+        return cached, await writer.get("jobs:1")
+
+    assert asyncio.run(scenario()) == (ROW, None)
+
+
+def test_sqlite_backend_prunes_least_recently_read(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=80, prune_every=1)
+
+    async def scenario():
+        await backend.set("a", {"v": "x" * 20}, 60.0)
+        time.sleep(0.01)
+        await backend.set("b", {"v": "y" * 20}, 60.0)
+        time.sleep(0.01)
+        await backend.get("a")
+        await backend.set("c", {"v": "z" * 20}, 60.0)
+        return [await backend.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [True, False, True]
+
+
+@pytest.fixture
+def jobs(stub):
+    stub.seed("jobs", [dict(ROW)])
+    return stub
+
+
+def test_get_row_caches_full_rows(jobs):
+    async def scenario():
+        first = await get_row("jobs", KEY)
+        before = jobs.request_count
+        second = await get_row("jobs", KEY)
+        narrow = await get_row("jobs", KEY, "title")
+        return first, second, narrow, jobs.request_count - before
+
+    first, second, narrow, queries = asyncio.run(scenario())
+    assert first == second == ROW
+    assert narrow == {"title": "Engineer"}
+    assert queries == 0
+
+
+def test_get_row_skips_caching_a_row_invalidated_mid_load(jobs, monkeypatch):
+    loader = cache.get_loader("jobs")
+    load = loader.load
+
+    async def load_then_invalidate(key, columns="*"):
+        row = await load(key, columns)
+        await get_read_cache().invalidate("jobs", key)
+        return row
+
+    monkeypatch.setattr(loader, "load", load_then_invalidate)
+
+    async def scenario():
+        row = await get_row("jobs", KEY)
+        return row, await get_read_cache().get("jobs", KEY)
+
+    assert asyncio.run(scenario()) == (ROW, None)
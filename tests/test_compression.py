@@ -0,0 +1,39 @@
+import pytest
+
+from compression import CompressedBodyCache, body_digest, negotiate
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0.8, br;q=0.8", "br"),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=abc", None),
+    ("deflate, gzip;q=0.1", "gzip"),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, ("br", "gzip")) == expected
+
+
+def test_negotiate_skips_unsupported_encodings():
+    assert negotiate("br, gzip;q=0.5", ("gzip",)) == "gzip"
+    assert negotiate("br", ("gzip",)) is None
+
+
+def test_compressed_body_cache_evicts_least_recently_used():
+    cache = CompressedBodyCache(max_bytes=10)
+    first, second, third = body_digest(b"first"), body_digest(b"second"), body_digest(b"third")
+    cache.set(first, "gzip", b"1234")
+    cache.set(second, "gzip", b"5678")
+    assert cache.get(first, "gzip") == b"1234"
+    cache.set(third, "gzip", b"9012")
+    assert cache.get(second, "gzip") is None
+    assert cache.get(first, "gzip") == b"1234"
+    assert cache.get(first, "br") is None
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+
+import pytest
+from postgrest.exceptions import APIError
+
+from dataloader import DataLoader, get_loader, normalize_key
+
+IDS = [str(uuid.UUID(int=i, version=4)) for i in range(1, 6)]
+
+
+@pytest.fixture
+def jobs(stub):
+    stub.seed("jobs", [{"id": job_id, "title": f"Job {i}", "company": "Acme"} for i, job_id in enumerate(IDS)])
+    return stub
+
+
+def test_normalize_key():
+    assert normalize_key(IDS[0].upper()) == IDS[0]
+    assert normalize_key("{" + IDS[0] + "}") == IDS[0]
+    assert normalize_key("user-42") == "user-42"
+
+
+def test_loads_in_one_tick_share_one_query(jobs):
+    loader = DataLoader("jobs")
+    missing = str(uuid.uuid4())
+
+    async def scenario():
+        return await asyncio.gather(*(loader.load(job_id) for job_id in [*IDS, missing, IDS[0]]))
+
+    before = jobs.request_count
+    rows = asyncio.run(scenario())
+    assert jobs.request_count - before == 1
+    assert [row["id"] for row in rows[:5]] == IDS
+    assert rows[5] is None
+    assert rows[6]["id"] == IDS[0]
+    assert loader.stats() == {"batches": 1, "keys": 6, "mean_batch_size": 6.0}
+
+
+def test_batches_are_split_at_max_batch_size(jobs):
+    loader = DataLoader("jobs", max_batch_size=2)
+
+    async def scenario():
+        return await asyncio.gather(*(loader.load(job_id) for job_id in IDS))
+
+    rows = asyncio.run(scenario())
+    assert [row["id"] for row in rows] == IDS
+    assert loader.batches == 3
+
+
+def test_column_selections_are_batched_separately(jobs):
+    loader = DataLoader("jobs")
+
+    async def scenario():
+        return await asyncio.gather(loader.load(IDS[0], "title"), loader.load(IDS[1]))
+
+    narrow, full = asyncio.run(scenario())
+    assert narrow == {"title": "Job 0"}
+    assert full["company"] == "Acme"
+    assert loader.batches == 2
+
+
+def test_keys_match_rows_in_any_case(jobs):
+    async def scenario():
+        return await get_loader("jobs").load(IDS[2].upper())
+
+    assert asyncio.run(scenario())["id"] == IDS[2]
+
+
+def test_a_rejected_batch_is_retried_key_by_key(jobs):
+    handle = jobs.handle
+
+    def reject_bad_keys(request):
+        if "not-a-uuid" in str(request.url):
+            return jobs._json(
+                {"message": 'invalid input syntax for type uuid: "not-a-uuid"', "code": "22P02",
+                 "hint": None, "details": None},
+                status=400,
+            )
+        return handle(request)
+
+    jobs.handle = reject_bad_keys
+    loader = DataLoader("jobs")
+
+    async def scenario():
+        return await asyncio.gather(*(loader.load(key) for key in [IDS[0], "not-a-uuid", IDS[1]]),
+                                    return_exceptions=True)
+
+    first, bad, second = asyncio.run(scenario())
+    assert first["id"] == IDS[0]
+    assert second["id"] == IDS[1]
+    assert isinstance(bad, APIError) and bad.code == "22P02"
+    assert loader.batches == 4
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+
+from starlette.requests import Request
+
+from database import get_supabase
+from etag import collection_etag, compute_etag, etag_matches, not_modified
+
+TAG = compute_etag(b'[{"id":1}]')
+
+
+def make_request(path="/job-applications/", query="", if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({
+        "type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": headers,
+    })
+
+
+def test_compute_etag_is_a_strong_tag_of_the_body():
+    assert TAG.startswith('"') and TAG.endswith('"')
+    assert TAG == compute_etag(b'[{"id":1}]')
+    assert TAG != compute_etag(b'[{"id":2}]')
+
+
+def test_etag_matches():
+    assert etag_matches(TAG, TAG)
+    assert etag_matches(TAG, f"W/{TAG}")
+    assert etag_matches(TAG, f'"other", {TAG}')
+    assert etag_matches(TAG, " * ")
+    assert not etag_matches(TAG, '"other"')
+    assert not etag_matches(TAG, TAG[:-2] + '"')
+
+
+def test_not_modified_answers_a_matching_if_none_match():
+    response = not_modified(make_request(if_none_match=f"W/{TAG}"), TAG)
+    assert response is not None
+    assert response.status_code == 304
+    assert response.headers["etag"] == TAG
+    assert response.body == b""
+
+
+def test_not_modified_without_a_match():
+    assert not_modified(make_request(), TAG) is None
+    assert not_modified(make_request(if_none_match='"other"'), TAG) is None
+
+
+def test_collection_etag_changes_with_every_write(stub):
+    user_id = str(uuid.uuid4())
+    request = make_request(query=f"user_id={user_id}")
+
+    async def tag():
+        return await collection_etag(request, "job_applications", user_id.upper())
+
+    async def scenario():
+        tags = [await tag()]
+        response = await get_supabase().table("job_applications").insert({"user_id": user_id}).execute()
+        tags.append(await tag())
+        tags.append(await tag())
+        await get_supabase().table("job_applications").update({"notes": "x"}).eq("id", response.data[0]["id"]).execute()
+        tags.append(await tag())
+        await get_supabase().table("job_applications").delete().eq("id", response.data[0]["id"]).execute()
+        tags.append(await tag())
+        return tags
+
+    empty, created, unchanged, updated, deleted = asyncio.run(scenario())
+    assert created == unchanged
+    assert len({empty, created, updated, deleted}) == 4
+
+
+def test_collection_etag_differs_per_query(stub):
+    user_id = str(uuid.uuid4())
+
+    async def tags():
+        return (
+            await collection_etag(make_request(query="limit=10"), "job_applications", user_id),
+            await collection_etag(make_request(query="limit=20"), "job_applications", user_id),
+        )
+
+    first, second = asyncio.run(tags())
+    assert first != second
@@ -0,0 +1,25 @@
+import pytest
+from fastapi import HTTPException
+
+from fields import FieldSelection
+from models import Job
+
+
+def test_no_fields_selects_everything():
+    assert FieldSelection(Job)(None) == "*"
+    assert FieldSelection(Job)("") == "*"
+
+
+def test_required_columns_come_first_without_duplicates():
+    assert FieldSelection(Job)("title, id,company") == "id,created_at,title,company"
+
+
+def test_custom_required_columns():
+    assert FieldSelection(Job, required=("id",))("title,,") == "id,title"
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(HTTPException) as raised:
+        FieldSelection(Job)("title,salary_in_btc")
+    assert raised.value.status_code == 400
+    assert "salary_in_btc" in raised.value.detail
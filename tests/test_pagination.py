@@ -0,0 +1,62 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from database import get_supabase
+from pagination import decode_cursor, encode_cursor, iter_pages
+
+KEY = "3f2b8c1e-9d4a-4f6b-8e2a-1c5d7e9f0a2b"
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"created_at": "2024-05-01T12:30:00+00:00", "id": KEY})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-05-01T12:30:00+00:00", KEY)
+
+
+def test_cursor_normalizes_values():
+    cursor = encode_cursor({"created_at": "2024-05-01T12:30:00.000+00:00", "id": KEY.upper()})
+    assert decode_cursor(cursor) == ("2024-05-01T12:30:00+00:00", KEY)
+
+
+def test_cursor_with_null_created_at():
+    cursor = encode_cursor({"created_at": None, "id": KEY})
+    assert decode_cursor(cursor) == (None, KEY)
+
+
+def test_cursor_with_other_key_column():
+    cursor = encode_cursor({"created_at": "2024-05-01T12:30:00+00:00", "user_id": KEY}, key="user_id")
+    assert decode_cursor(cursor)[1] == KEY
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    encode_cursor({"created_at": "yesterday", "id": KEY}),
+    encode_cursor({"created_at": "2024-05-01T12:30:00+00:00", "id": 'x") or (1=1'}),
+    encode_cursor({"created_at": "2024-05-01T12:30:00+00:00", "id": None}),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_iter_pages_walks_rows_without_created_at_first(stub):
+    rows = [{"id": str(uuid.UUID(int=i, version=4)), "created_at": None} for i in range(3)]
+    rows += [
+        {"id": str(uuid.UUID(int=10 + i, version=4)), "created_at": f"2024-01-0{i + 1}T00:00:00+00:00"}
+        for i in range(4)
+    ]
+    stub.seed("jobs", rows)
+
+    async def walk():
+        build_query = lambda: get_supabase().table("jobs").select("id,created_at")  # noqa: E731
+        return [row async for page in iter_pages(build_query, page_size=2) for row in page]
+
+    seen = asyncio.run(walk())
+    assert sorted(row["id"] for row in seen) == sorted(row["id"] for row in rows)
+    assert [row["created_at"] for row in seen[:3]] == [None, None, None]
+    dated = [row["created_at"] for row in seen[3:]]
+    assert dated == sorted(dated, reverse=True)
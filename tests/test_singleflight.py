@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"rows": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)), flight.do("other", fetch))
+
+    *same, other = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert all(result is same[0] for result in same)
+    assert other is not same[0]
+    assert flight.stats() == {"in_flight": 0, "executed": 2, "shared": 4}
+
+
+def test_calls_after_completion_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return await flight.do("key", fetch), await flight.do("key", fetch)
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_exceptions_are_shared():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    assert flight.stats()["executed"] == 1
+
+
+def test_forget_starts_a_new_call_for_later_callers():
+    flight = SingleFlight()
+    versions = iter(["before write", "after write"])
+
+    async def fetch():
+        value = next(versions)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def scenario():
+        early = asyncio.ensure_future(flight.do(("/jobs", "GET"), fetch))
+        await asyncio.sleep(0)
+        flight.forget(lambda key: key[0] == "/jobs")
+        late = asyncio.ensure_future(flight.do(("/jobs", "GET"), fetch))
+        return await early, await late
+
+    assert asyncio.run(scenario()) == ("before write", "after write")
+
+
+def test_forget_leaves_other_keys_shared():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do(("/cvs", "GET"), fetch))
+        await asyncio.sleep(0)
+        flight.forget(lambda key: key[0] == "/jobs")
+        second = asyncio.ensure_future(flight.do(("/cvs", "GET"), fetch))
+        return await first, await second
+
+    first, second = asyncio.run(scenario())
+    assert first is second
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        leaving = asyncio.ensure_future(flight.do("key", fetch))
+        staying = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0.005)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(scenario()) == "done"
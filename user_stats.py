@@ -0,0 +1,36 @@
+from typing import Any, Dict, Optional
+
+from database import get_supabase
+from singleflight import add_derived_table, execute_read
+
+# Maintained by the triggers in migrations/003_user_application_stats.sql
+STATS_TABLE = "user_application_stats"
+
+add_derived_table(STATS_TABLE, ("job_applications", "application_timeline"))
+
+
+def to_user_stats(user_id: str, row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shape a stats row for the API; users without applications have no row yet"""
+    if row is None:
+        return {"user_id": user_id}
+    scored = row.get("scored_applications") or 0
+    return {
+        "user_id": user_id,
+        "total_applications": row.get("total_applications") or 0,
+        "applications_by_status": row.get("status_counts") or {},
+        "scored_applications": scored,
+        "average_ai_match_score": (row.get("ai_match_score_sum") or 0) / scored if scored else None,
+        "timeline_events": row.get("timeline_events") or 0,
+        "last_activity_at": row.get("last_activity_at"),
+    }
+
+
+async def get_user_stats(user_id: str) -> Dict[str, Any]:
+    """A user's application statistics.
+
+    One primary-key read, made straight to the database rather than through the
+    read cache, so writes from any worker, bulk endpoints or outside the API
+    show up immediately.
+    """
+    response = await execute_read(get_supabase().table(STATS_TABLE).select("*").eq("user_id", user_id))
+    return to_user_stats(user_id, response.data[0] if response.data else None)